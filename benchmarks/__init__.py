@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Benchmarks of the utils functions on synthetic TrizStock workbooks.
+#   python -m benchmarks --size medium --output bench_report.json
+# ----------------------------------------------------------------------------
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Time the public utils functions on a synthetic dataset and write a JSON report.
+#   python -m benchmarks --size medium --repeat 5 --output bench_report.json
+#   python -m benchmarks --compare bench_report.json       # speedup against an older report
+# ----------------------------------------------------------------------------
+import os
+import sys
+import json
+import time
+import shutil
+import contextlib
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import importlib.util
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils                                        # noqa: E402
+from benchmarks import synthetic                    # noqa: E402
+
+
+def measure(func, repeat, setup=None):
+    """
+    Run func() repeat times (setup() before each run, not timed).
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def uncached(*funcs):
+    """
+    setup() clearing the memoize caches of funcs and of the charts they build.
+    """
+    def setup():
+        for func in (*funcs, utils.pie_chart, utils.figure):
+            func.cache_clear()
+    return setup
+
+
+@contextlib.contextmanager
+def temporary_dirs(cache_dir, store_dir):
+    """
+    Point the cache and the store of utils to other folders, in this process and in the
+    worker processes (workers=None benchmarks import utils again and read the environment).
+    """
+    dirs = {"DASHBOARD_CACHE_DIR": cache_dir, "DASHBOARD_STORE_DIR": store_dir}
+    saved = utils.CACHE_DIR, utils.STORE_DIR, {name: os.environ.get(name) for name in dirs}
+    utils.CACHE_DIR, utils.STORE_DIR = cache_dir, store_dir
+    os.environ.update(dirs)
+    try:
+        yield
+    finally:
+        utils.CACHE_DIR, utils.STORE_DIR, env = saved
+        for name, value in env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run(size="small", repeat=3, seed=0):
+    """
+    Build the dataset in a temporary folder (cache and store too) and time every function.
+    Returns the report dict.
+    """
+    results = []
+
+    def bench(name, func, setup=None):
+        times = measure(func, repeat, setup)
+        results.append({
+            "name": name,
+            "repeat": repeat,
+            "min_s": min(times),
+            "median_s": statistics.median(times),
+            "max_s": max(times),
+        })
+        print(f"{name:<55} {min(times) * 1000:>10.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp, temporary_dirs(os.path.join(tmp, "cache"), os.path.join(tmp, "store")):
+        def cold():
+            shutil.rmtree(utils.CACHE_DIR, ignore_errors=True)
+            shutil.rmtree(utils.STORE_DIR, ignore_errors=True)
+
+        print(f"[+] Synthetic dataset ({size})...")
+        dataset = synthetic.make_dataset(os.path.join(tmp, "data"), size, seed)
+        livraison, vente = dataset["livraison"], dataset["vente"]
+        months = synthetic.MONTHS[:synthetic.SIZES[size]["months"]]
+        print('-' * 70)
+
+        # --- Loaders ---
+        bench("read_livraison_multi_year[cold]",
+              lambda: utils.read_livraison_multi_year(livraison, months), setup=cold)
+        bench("read_livraison_multi_year[cold, workers=all]",
+              lambda: utils.read_livraison_multi_year(livraison, months, workers=None), setup=cold)
+        bench("read_livraison_multi_year[warm]",
+              lambda: utils.read_livraison_multi_year(livraison, months))
+        bench("read_livraison_store", lambda: utils.read_livraison_store(months))
+        bench("read_livraison_sheet[cold]",
+              lambda: utils.read_livraison_sheet(livraison[0], months[0]), setup=cold)
+        bench("read_livraison_sheet[warm]", lambda: utils.read_livraison_sheet(livraison[0], months[0]))
+
+        engines = [engine for engine in utils.SALES_ENGINES
+                   if engine != "calamine" or importlib.util.find_spec("python_calamine")]
+        for engine in engines:
+            bench(f"read_sales_files[cold, engine={engine}]",
+                  lambda: utils.read_sales_files(vente, engine=engine), setup=cold)
+        bench("read_sales_files[cold, workers=all]",
+              lambda: utils.read_sales_files(vente, engine="stream", workers=None), setup=cold)
+        bench("read_sales_files[warm]", lambda: utils.read_sales_files(vente, engine="stream"))
+        bench("read_sales_store", lambda: utils.read_sales_store())
+
+        # --- Livraison KPIs ---
+        raw = pd.read_excel(livraison[0], sheet_name=months[0], usecols="A:H")
+        bench("clean_dataframe", lambda: utils.clean_dataframe(raw))
+
+        df = utils.read_livraison_multi_year(livraison, months)["data"]
+        bench("build_livraison_rollup", lambda: utils.build_livraison_rollup(df))
+        rollup = utils.build_livraison_rollup(df)
+        day = df["DATE"].iloc[len(df) // 2]
+        fields = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
+        for source, data in (("rows", df), ("rollup", rollup)):
+            bench(f"etat_excel_like_db[{source}]", lambda: utils.etat_excel_like_db(data))
+            bench(f"etat_mensuel[{source}]", lambda: utils.etat_mensuel(data))
+            bench(f"sum_by_driver[{source}]", lambda: utils.sum_by_driver(data, fields))
+            bench(f"driver_retour[{source}]", lambda: utils.driver_retour(data))
+            bench(f"get_day_details[{source}]", lambda: utils.get_day_details(data, day, fields))
+            bench(f"driver_observations[{source}]", lambda: utils.driver_observations(data))
+
+        # --- Vente aggregations ---
+        df_mois = utils.read_sales_files(vente, engine="stream")["df"]
+        df_month = df_mois[df_mois["MOIS"] == months[-1]]
+        # Memoized: every run starts with empty caches, the computation is timed, not an LRU hit
+        bench("build_totals_mois", lambda: utils.build_totals_mois(df_mois),
+              setup=uncached(utils.build_totals_mois))
+        bench("build_totals_prevendeur_mois", lambda: utils.build_totals_prevendeur_mois(df_mois),
+              setup=uncached(utils.build_totals_prevendeur_mois))
+        bench("familly_groupe", lambda: utils.familly_groupe(df_month), setup=uncached(utils.familly_groupe))
+        bench("sfamilly_groupe", lambda: utils.sfamilly_groupe(df_month), setup=uncached(utils.sfamilly_groupe))
+        bench("build_product_cube", lambda: utils.build_product_cube(df_mois), setup=uncached(utils.build_product_cube))
+        cube = utils.build_product_cube(df_mois)
+        bench("build_produits[rows]", lambda: utils.build_produits(df_month), setup=uncached(utils.build_produits))
+        bench("build_produits[cube, by prevendeur]",
+              lambda: utils.build_produits(cube, ("Produit", "PREVENDEUR")), setup=uncached(utils.build_produits))
+        totals = utils.build_totals_prevendeur_mois(df_mois)[["YEAR", "MOIS_NUM", "MOIS", "PREVENDEUR", "livraison", "benefice"]]
+        bench("add_deltas[month, by prevendeur]",
+              lambda: utils.add_deltas(totals, ["livraison", "benefice"], by=["PREVENDEUR"]))
+        bench("add_deltas[year]", lambda: utils.add_deltas(totals, ["livraison"], by=["PREVENDEUR"], period="year"))
+        bench("pie_data[Produit, top]", lambda: utils.pie_data(df_month, "Produit", "Quantité"))
+
+        # --- Table search / sort (widgets.data_table) ---
+        bench("SearchIndex", lambda: utils.SearchIndex(df_mois["Produit"]))
+        index = utils.SearchIndex(df_mois["Produit"])
+        bench("SearchIndex.search", lambda: [index.search(query) for query in synthetic.SEARCH_QUERIES])
+        bench("filter_rows[cold index]",
+              lambda: [utils.filter_rows(df_mois, "Produit", query) for query in synthetic.SEARCH_QUERIES],
+              setup=uncached(utils.filter_rows, utils.search_index))
+        bench("sort_rows", lambda: utils.sort_rows(df_mois, "Total livraison (DA)", ascending=False),
+              setup=uncached(utils.sort_rows))
+
+    return {
+        "size": size,
+        "seed": seed,
+        "rows": {"livraison": len(df), "vente": len(df_mois)},
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """
+    Print the speedup of report against an older one (min times).
+    """
+    old = {result["name"]: result["min_s"] for result in baseline["results"]}
+    print('-' * 70)
+    print(f"Comparison with {baseline['created']} ({baseline['size']})")
+    for result in report["results"]:
+        if result["name"] in old and result["min_s"]:
+            ratio = old[result["name"]] / result["min_s"]
+            flag = "  <-- regression" if ratio < 0.9 else ""
+            print(f"{result['name']:<55} x{ratio:>7.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark utils on synthetic TrizStock workbooks.")
+    parser.add_argument("--size", choices=synthetic.SIZES, default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_report.json", help="JSON report path")
+    parser.add_argument("--compare", help="older JSON report to compare with")
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.repeat, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print('-' * 70)
+    print(f"[✓] Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Synthetic LIVRAISON_<YEAR>.xlsx and VENTE_<MOIS>_<YEAR>.xlsx workbooks,
+# same layout as the real files read by utils.
+# ----------------------------------------------------------------------------
+import os
+import random
+import calendar
+import datetime
+import openpyxl
+
+MONTHS = ["JANVIER", "FEVRIER", "MARS", "AVRIL", "MAI", "JUIN", "JUILLET",
+          "AOUT", "SEPTEMBRE", "OCTOBRE", "NOVEMBRE", "DECEMBRE"]
+LIVREURS = ["AMINE", "TOUFIK", "REDA", "MOHAMED"]
+COMPTES = ["ACCOMPTE", "CREDIT", "VERS. CREDIT"]        # Special LIVREUR rows of the sheet
+PREVENDEURS = ["WALID", "MOHAMED", "FETHI", "MM"]
+OBSERVATIONS = ["", "", "", "• Retard livraison", "• Client absent • Retour partiel", "• Produit endommagé"]
+FAMILLES = ["BOISSONS", "CONFISERIE", "CRÈMERIE", "ÉPICERIE", "HYGIÈNE", "CAFÉ & THÉ", "CONSERVES", "SURGELÉS"]
+NOMS = ["Crème", "Eau minérale", "Café moulu", "Thé vert", "Biscuit", "Chocolat", "Jus d'orange",
+        "Fromage", "Lait", "Yaourt", "Pâtes", "Sucre", "Savon", "Shampoing", "Thon", "Petits pois"]
+
+SEARCH_QUERIES = ["creme", "CAFÉ moulu", "1l", "the vert 250g", "#12"]     # Accents / case / several words
+
+# --- Presets for --size ---
+SIZES = {
+    "small": {"years": 1, "months": 2, "livreurs": 4, "prevendeurs": 4, "products": 200},
+    "medium": {"years": 2, "months": 6, "livreurs": 8, "prevendeurs": 4, "products": 1_000},
+    "large": {"years": 3, "months": 12, "livreurs": 16, "prevendeurs": 8, "products": 4_000},
+}
+
+
+def product_catalog(count, seed=0):
+    """
+    [(Famille, Sous famille, Produit)] with accented French names.
+    """
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(count):
+        famille = FAMILLES[i % len(FAMILLES)]
+        sous_famille = f"{famille.title()} {1 + rng.randrange(6)}"
+        produit = f"{rng.choice(NOMS)} {rng.choice(['1L', '500G', '250G', '2L', '12X'])} #{i}"
+        catalog.append((famille, sous_famille, produit))
+    return catalog
+
+
+def make_livraison_workbook(path, year, months, livreurs, seed=0):
+    """
+    One sheet per month, columns A:H, a row per (day, livreur) then a TOTAL row without DATE.
+    """
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    for month in months:
+        ws = wb.create_sheet(month)
+        ws.append(["DATE", "LIVREUR", "T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF", "OBSERVATION"])
+        month_num = MONTHS.index(month) + 1
+        for day in range(1, calendar.monthrange(year, month_num)[1] + 1):
+            date = datetime.datetime(year, month_num, day)
+            for livreur in livreurs + COMPTES:
+                commande = rng.randrange(20_000, 400_000, 50)
+                logiciel = commande - rng.choice([0, 0, 0, rng.randrange(0, 20_000, 50)])
+                versement = logiciel - rng.choice([0, 0, rng.randrange(0, 5_000, 10)])
+                charge = rng.choice([None, None, rng.randrange(500, 5_000, 100)])
+                ws.append([
+                    date, livreur, commande, logiciel, versement, charge,
+                    versement - logiciel, rng.choice(OBSERVATIONS) or None,
+                ])
+        ws.append([None, "TOTAL", None, None, None, None, None, None])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def make_vente_workbook(path, mois, year, prevendeurs, catalog, seed=0):
+    """
+    TrizStock export layout: a first summary sheet (skipped by read_sales_files),
+    then one sheet per PREVENDEUR with a 14-row preamble, the header, the products and the totals.
+    """
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook(write_only=True)
+    for sheet in ["VENTE"] + prevendeurs:
+        ws = wb.create_sheet(sheet)
+        # --- Preamble (14 rows) ---
+        ws.append(["TRIZSTOCK"])
+        ws.append(["Détail des produits sortis"])
+        ws.append([])
+        ws.append(["Camion:", sheet])
+        ws.append(["Période:", f"{mois} {year}"])
+        for _ in range(9):
+            ws.append([])
+        # --- Header (2 "Quantité" columns, the 2nd one is the delivered quantity) ---
+        ws.append(["Famille", "Sous famille", "Produit", "Quantité", "Prix unitaire", "Quantité",
+                   "Total livraison (DA)", "Total bénéfice (DA)"])
+        total_qte = total_livraison = total_benefice = 0
+        for famille, sous_famille, produit in catalog:
+            if rng.random() < 0.3:
+                continue                # Not sold by this prevendeur this month
+            prix = rng.randrange(20, 3_000)
+            qte = rng.randrange(1, 500)
+            livraison = round(qte * prix * 1.0, 2)
+            benefice = round(livraison * rng.uniform(0.03, 0.2), 2)
+            ws.append([famille, sous_famille, produit, qte + rng.randrange(0, 20), prix, qte, livraison, benefice])
+            total_qte += qte
+            total_livraison += livraison
+            total_benefice += benefice
+        # --- Footer ---
+        ws.append([None, None, "TOTAL", None, None, total_qte, total_livraison, total_benefice])
+        ws.append([])
+        ws.append([None, None, "Imprimé par TrizStock"])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def make_dataset(folder, size="small", seed=0):
+    """
+    Write a full synthetic dataset in folder.
+    Returns {"livraison": [paths], "vente": [paths]}
+    """
+    config = SIZES[size]
+    years = [2026 - config["years"] + i for i in range(config["years"])]
+    months = MONTHS[:config["months"]]
+    livreurs = (LIVREURS * 4)[:config["livreurs"]]
+    livreurs = [name if i < len(LIVREURS) else f"{name}{i}" for i, name in enumerate(livreurs)]
+    prevendeurs = [name if i < len(PREVENDEURS) else f"{name}{i}"
+                   for i, name in enumerate((PREVENDEURS * 4)[:config["prevendeurs"]])]
+    catalog = product_catalog(config["products"], seed)
+
+    dataset = {"livraison": [], "vente": []}
+    for n, year in enumerate(years):
+        path = os.path.join(folder, f"LIVRAISON_{year}.xlsx")
+        dataset["livraison"].append(make_livraison_workbook(path, year, months, livreurs, seed + n))
+        for m, mois in enumerate(months):
+            path = os.path.join(folder, f"VENTE_{mois}_{year}.xlsx")
+            dataset["vente"].append(make_vente_workbook(path, mois, year, prevendeurs, catalog, seed + 100 * n + m))
+    return dataset
@@ -8,7 +8,6 @@
 
 import pandas as pd
 import utils
-import plotly.express as px
 import streamlit as st
 import widgets
 
@@ -19,13 +18,106 @@ st.space()
 
 
 # Load the dataframe with pandas and cache it with streamlit to avoid reload again and again
-@st.cache_data
-def load_data_from_excel(excel_file, sheet_name):
-    df = pd.read_excel(excel_file, sheet_name=sheet_name, usecols="A:H", nrows=243)
-    data = utils.clean_dataframe(df)
+# (utils keeps a Parquet copy on disk, so a file already seen is not parsed again after a restart)
+@st.cache_data(hash_funcs={utils.Workbook: lambda workbook: workbook.digest})
+def load_data_from_excel(workbook, sheet_name):
+    data = utils.read_livraison_sheet(workbook, sheet_name, nrows=243)
+    if data["success"]:
+        data["rollup"] = utils.build_livraison_rollup(data["df"])      # Daily totals behind every KPI
     return data
 
 
+# --- Sections with their own inputs: a change reruns only the fragment, not the page ---
+@st.fragment
+def etat_chart(etat_excel):
+    # Convert to Pandas dataframe
+    etat_excel_pd = pd.DataFrame(etat_excel.items(), columns=["TYPE", "MONTANT"])
+    etat_excel_pd["MONTANT"] = etat_excel_pd["MONTANT"].abs()       # convert to absolute values
+
+    etat_types = st.pills(
+        "Sélectionner les types à afficher dans le graphique:",
+        options=etat_excel_pd["TYPE"].tolist(),
+        default=etat_excel_pd["TYPE"].tolist(),
+        selection_mode="multi",
+        key="etat_types"
+    )
+
+    etat_excel_pd = etat_excel_pd.query('TYPE == @etat_types')
+    fig_etat = utils.pie_chart(etat_excel_pd, "TYPE", "MONTANT")
+    # Display table and chart side by side
+    widgets.table_chart_column(st, etat_excel_pd, fig_etat)
+
+
+def day_details_picker(year, month_num):
+    # Popover + form inside the fragment: Submit reruns only the section (a st.dialog closes on a full rerun only)
+    import datetime
+    with st.popover("Sélectionner Le Jour."), st.form("day_details_form", border=False):
+        st.write("Entrée la date:")
+        date = st.date_input("Date:", datetime.date(year, month_num, 1))
+        if st.form_submit_button("Submit"):
+            st.session_state.day_details = {"day_details": date}
+
+
+@st.fragment
+def day_details_section(df, rollup, year, month_num):
+    label_column, button_column = st.columns([0.7, 0.3], vertical_alignment="bottom")
+    label_column.subheader("📅 _Détails Journée_", divider="gray", width="content")
+    with button_column:
+        st.space("small")
+        day_details_picker(year, month_num)
+
+    # Proccessing
+    if "day_details" not in st.session_state:
+        return
+    date = st.session_state.day_details["day_details"]
+    st.space("medium")
+    fields = st.pills(
+        "Sélectionner les champs à afficher:",
+        options=df.columns.tolist()[2:],        # skip the DATE and LIVREUR column
+        default=df.columns.tolist()[2:],
+        selection_mode="multi"
+    )
+    st.space()
+    st.markdown(f"#### Le {date.strftime('%d/%m/%Y')}", text_alignment="right")
+    day_details = utils.get_day_details(rollup, date, fields)
+    if not day_details["success"]:
+        st.warning("Aucune donnée pour cette date.")
+    else:
+        day_details = day_details["data"]
+        st.dataframe(
+            day_details,
+            column_config={"DATE": st.column_config.DateColumn("DATE", format="DD-MM-YYYY")},
+            hide_index=True,
+            width="stretch"
+        )
+
+
+@st.fragment
+def observations_section(rollup):
+    observations = utils.driver_observations(rollup)
+    options_column, display_column = st.columns([0.4, 0.6], border=True, gap="small")
+    with options_column:
+        option = st.selectbox(
+            "Sélectionner le livreur pour voir les observations:",
+            options=observations["LIVREUR"].unique()
+        )
+    with display_column:
+        filtered_observations = observations[observations["LIVREUR"] == option]
+        st.markdown(f"##### Observations pour le livreur: {option}")
+        for obs in filtered_observations["OBSERVATION"]:
+            parts = obs.split("•")
+            cleaned_lines = []
+            for part in parts:
+                part = part.strip()
+                if part:
+                    cleaned_lines.append(part)
+            try:
+                cleaned_lines[0] = f"- {cleaned_lines[0]}"
+                st.markdown("\n- ".join(cleaned_lines))
+            except IndexError:
+                st.markdown("- Aucune observation.")
+
+
 # Load data
 excel_file = st.file_uploader("Télécharger le fichier Excel de Livraison", type=["xlsx"])
 
@@ -42,19 +134,22 @@ else:
     year = int(match.group(2))
 
     st.text(f"Year: {year}")
-    f = pd.ExcelFile(excel_file)
-    sheets = f.sheet_names
+    workbook = utils.Workbook(excel_file)      # Opened once, shared by the sheet list and the loader
+    sheets = workbook.sheet_names
     st.space("medium")
     sheet_name = st.selectbox("Sélectionner la feuille Excel:", sheets)
     st.session_state.sheet_name = {"sheet_name": sheet_name}
 
 if st.session_state.get("sheet_name"):
-    data = load_data_from_excel(excel_file, sheet_name)
+    data = load_data_from_excel(workbook, sheet_name)
     if not data["success"]:
         st.warning(data["message"])
         st.stop()
     else:
+        if data.get("warning"):
+            st.warning(data["warning"])         # Rows dropped by the cleaning
         df = data["df"]
+        rollup = data["rollup"]
 else:
     st.warning("Please select a sheet to proceed.")
     st.stop()
@@ -80,7 +175,7 @@ livreur = st.sidebar.pills(
 # ---- Etat Mensuel ----
 # ----------------------
 st.space()
-etat_excel = utils.etat_excel_like_db(df)
+etat_excel = utils.etat_excel_like_db(rollup)
 
 st.subheader("💰 _Etat Mensuel_", text_alignment="left", divider="gray", width="stretch")
 
@@ -96,27 +191,7 @@ versement_column.metric("🚚 *VERSEMENT:* ", etat_excel.get('VERSEMENT', 0), bo
 charges_column.metric("💸 *CHARGES:* ", etat_excel.get('CHARGES', 0), border=True)
 st.divider()
 
-# Convert to Pandas dataframe
-etat_excel_pd = pd.DataFrame(etat_excel.items(), columns=["TYPE", "MONTANT"])
-etat_excel_pd["MONTANT"] = etat_excel_pd["MONTANT"].abs()       # convert to absolute values
-
-etat_types = st.pills(
-    "Sélectionner les types à afficher dans le graphique:",
-    options=etat_excel_pd["TYPE"].tolist(),
-    default=etat_excel_pd["TYPE"].tolist(),
-    selection_mode="multi",
-    key="etat_types"
-)
-
-etat_excel_pd = etat_excel_pd.query('TYPE == @etat_types')
-fig_etat = px.pie(
-    etat_excel_pd,
-    names="TYPE",
-    values="MONTANT",
-    template="plotly_white",
-)
-# Display table and chart side by side
-widgets.table_chart_column(st, etat_excel_pd, fig_etat)
+etat_chart(etat_excel)      # Types pills + table + pie
 st.divider()
 
 # ----------------------------------
@@ -125,13 +200,14 @@ st.divider()
 fields = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
 st.subheader("📋 _Etat Journalier_", divider="gray", width="content")
 etat_journalier = pd.pivot_table(
-    df,
+    rollup,
     index="DATE",
     values=fields,
     aggfunc="sum",
     margins=True, margins_name="TOTAL",
     fill_value=0,
-    sort=False
+    sort=False,
+    observed=True,
 )
 etat_journalier.name = "Date"
 st.dataframe(etat_journalier)       # Dispaly in Streamlit
@@ -143,26 +219,26 @@ st.divider()
 st.subheader("💵 Etat _Versements_, _Commandes_ Par Jours", divider="gray", width="content")
 # Prepare the data for the Chart
 df_plot = (
-    df.groupby("DATE")[["VERSEMENT", "T. COMMANDE"]]
+    rollup.groupby("DATE")[["VERSEMENT", "T. COMMANDE"]]
     .sum()
     .sort_index()
     .reset_index()
 )
-# Build the Chart
-fig_versement = px.line(
+# Build the Chart (cached on the data and parameters)
+fig_versement = utils.figure(
+    "line",
     df_plot,
     x="DATE",
     y=["VERSEMENT", "T. COMMANDE"],
     markers=True,
     hover_data={"DATE": "|%B %d, %Y"},
     template="plotly_white",
-)
-
-fig_versement.update_layout(
-    title="Évolution des versements et commandes",
-    xaxis_title="Date",
-    yaxis_title="Montant (DA)",
-    legend_title="Type",
+    layout=dict(
+        title="Évolution des versements et commandes",
+        xaxis_title="Date",
+        yaxis_title="Montant (DA)",
+        legend_title="Type",
+    ),
 )
 # Display the Chart
 st.plotly_chart(fig_versement, width="stretch")
@@ -174,14 +250,15 @@ st.divider()
 st.space()
 st.subheader("🚚 _Etat Versement Par Livreur_", divider="gray", width="content")
 fields = ["VERSEMENT", "CHARGE"]
-sum_by_driver = utils.sum_by_driver(df, fields, livreur_selection=livreur)
+sum_by_driver = utils.sum_by_driver(rollup, fields, livreur_selection=livreur)
 sum_by_driver = sum_by_driver.sort_values(by="VERSEMENT", ascending=False)
 # Graphique Versement par Livreur
 if len(sum_by_driver) == 0:
     st.warning("Aucun livreur sélectionné.")
 else:
     # Create the figure
-    fig_livreur = px.histogram(
+    fig_livreur = utils.figure(
+        "histogram",
         sum_by_driver,
         x=sum_by_driver.index,
         y=["VERSEMENT", "CHARGE"],
@@ -189,11 +266,11 @@ else:
         # title="<b>Versement par Livreur</b>",
         text_auto=True,
         template="plotly_white",
-    )
-    fig_livreur.update_layout(
-        xaxis_title="Livreur",
-        yaxis_title="Montant (DA)",
-        legend_title="Type",
+        layout=dict(
+            xaxis_title="Livreur",
+            yaxis_title="Montant (DA)",
+            legend_title="Type",
+        ),
     )
     # display the chart
     widgets.table_chart_column(st, sum_by_driver.reset_index(), fig_livreur)
@@ -203,24 +280,12 @@ st.divider()
 # ---- Versement Commande Pourcentage ----
 # ------------------------------------------
 fields = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
-sum_by_driver = utils.sum_by_driver(df, fields, livreur_selection=livreur)
+sum_by_driver = utils.sum_by_driver(rollup, fields, livreur_selection=livreur)
 sum_by_driver = sum_by_driver.reset_index()
 # Versement Chart
-etat_vers_chart = px.pie(
-    sum_by_driver,
-    names="LIVREUR",
-    values="VERSEMENT",
-    title="<b>💵 Etat Versement</b>",
-    template="plotly_white",
-)
+etat_vers_chart = utils.pie_chart(sum_by_driver, "LIVREUR", "VERSEMENT", title="<b>💵 Etat Versement</b>")
 # Commande Chart
-etat_cmd_chart = px.pie(
-    sum_by_driver,
-    names="LIVREUR",
-    values="T.LOGICIEL",
-    title="<b>🛵 Etat Prevendeur</b>",
-    template="plotly_white",
-)
+etat_cmd_chart = utils.pie_chart(sum_by_driver, "LIVREUR", "T.LOGICIEL", title="<b>🛵 Etat Prevendeur</b>")
 widgets.two_chart_columns(st, etat_vers_chart, etat_cmd_chart)
 st.divider()
 
@@ -232,15 +297,14 @@ st.code(
     "Le retour est calculé comme la différence entre 'T. COMMANDE' et 'T.LOGICIEL'.",
     language="markdown"
 )
-driver_retour, sum_retour_by_driver = utils.driver_retour(df)
+driver_retour, sum_retour_by_driver = utils.driver_retour(rollup)
 sum_retour_by_driver = sum_retour_by_driver[sum_retour_by_driver["LIVREUR"].isin(livreur)]
 
-retour_chart = px.pie(
+retour_chart = utils.pie_chart(
     sum_retour_by_driver,
-    names="LIVREUR",
-    values="RETOUR",
+    "LIVREUR",
+    "RETOUR",
     # title="<b>Retour par Livreur</b>",
-    template="plotly_white",
 )
 widgets.table_chart_column(st, sum_retour_by_driver, retour_chart)
 st.divider()
@@ -249,76 +313,14 @@ st.divider()
 # -------------------------------------
 # ---- Details for a specific date ----
 # -------------------------------------
-@st.dialog("Details Journalier")
-def day_details():
-    import datetime
-    st.write("Entrée la date:")
-    month_num = utils.MONTHS_NAMES.get(sheet_name)
-    date = st.date_input("Date:", datetime.date(year, month_num, 1))
-    if st.button("Submit"):
-        st.session_state.day_details = {"day_details": date}
-        st.rerun()
-
-
-label_column, button_column = st.columns([0.7, 0.3], vertical_alignment="bottom")
-label_column.subheader("📅 _Détails Journée_", divider="gray", width="content")
-with button_column:
-    st.space("small")
-    st.button("Sélectionner Le Jour.", on_click=day_details)
-
-# Proccessing
-if "day_details" not in st.session_state:
-    pass
-else:
-    date = st.session_state.day_details["day_details"]
-    st.space("medium")
-    fields = st.pills(
-        "Sélectionner les champs à afficher:",
-        options=df.columns.tolist()[2:],        # skip the DATE and LIVREUR column
-        default=df.columns.tolist()[2:],
-        selection_mode="multi"
-    )
-    st.space()
-    st.markdown(f"#### Le {date.strftime('%d/%m/%Y')}", text_alignment="right")
-    day_details = utils.get_day_details(df, date, fields)
-    if not day_details["success"]:
-        st.warning("Aucune donnée pour cette date.")
-    else:
-        day_details = day_details["data"]
-        st.dataframe(
-            day_details,
-            column_config={"DATE": st.column_config.DateColumn("DATE", format="DD-MM-YYYY")},
-            hide_index=True,
-            width="stretch"
-        )
+day_details_section(df, rollup, year, utils.MONTHS_NAMES.get(sheet_name))
 st.divider()
 
 # ----------------------
 # ---- Observations ----
 # ----------------------
 st.subheader("🧾 Les Observations", divider="gray", width="content")
-observations = utils.driver_observations(df)
-options_column, display_column = st.columns([0.4, 0.6], border=True, gap="small")
-with options_column:
-    option = st.selectbox(
-        "Sélectionner le livreur pour voir les observations:",
-        options=observations["LIVREUR"].unique()
-    )
-with display_column:
-    filtered_observations = observations[observations["LIVREUR"] == option]
-    st.markdown(f"##### Observations pour le livreur: {option}")
-    for obs in filtered_observations["OBSERVATION"]:
-        parts = obs.split("•")
-        cleaned_lines = []
-        for part in parts:
-            part = part.strip()
-            if part:
-                cleaned_lines.append(part)
-        try:
-            cleaned_lines[0] = f"- {cleaned_lines[0]}"
-            st.markdown("\n- ".join(cleaned_lines))
-        except IndexError:
-            st.markdown("- Aucune observation.")
+observations_section(rollup)
 
 
 # hide some stylesheet
@@ -1,15 +1,28 @@
 import streamlit as st
 import pandas as pd
 import utils
-import plotly.express as px
+import widgets
 
 
-@st.cache_data
-def load_date_from_excel(excel_file, selected_months):
-    return utils.read_livraison_multi_year(excel_file, selected_months)
+def with_rollup(data):
+    # Daily totals per LIVREUR, the pivots and totals below are computed from them
+    if data["success"]:
+        data["rollup"] = utils.build_livraison_rollup(data["data"])
+    return data
+
+
+@st.cache_data(hash_funcs={utils.Workbook: lambda workbook: workbook.digest})
+def load_date_from_excel(workbooks, selected_months):
+    return with_rollup(utils.read_livraison_multi_year(workbooks, selected_months, workers=None))     # One process per file
     # return utils.read_livraison_files(excel_file, selected_months)
 
 
+@st.cache_data
+def load_data_from_store(selected_months, store_version):
+    # store_version: reload when a new month is written in the store
+    return with_rollup(utils.read_livraison_store(selected_months))
+
+
 # Page configuration
 st.set_page_config(page_title="Livraison Dashboard", page_icon=":bar_chart:", layout="wide")
 st.title(":bar_chart: _Livraison Dashboard Multiple Mois_", text_alignment="center")
@@ -22,25 +35,35 @@ excel_file = st.file_uploader(
     type=["xlsx"]
 )
 
-if not excel_file:
-    st.warning("Please upload an Excel file to proceed.")
-    st.stop()
-else:
+# Months already in the store (every uploaded month is saved there)
+stored_months = sorted(
+    utils.store_partitions("livraison")["MOIS"].unique(),
+    key=lambda month: utils.mois_order.get(month, 13)
+)
+
+if excel_file:
     months = list()
-    for file in excel_file:
-        f = pd.ExcelFile(file)
-        for sheet in f.sheet_names:
+    workbooks = [utils.Workbook(file) for file in excel_file]     # Each upload is opened once
+    for workbook in workbooks:
+        for sheet in workbook.sheet_names:
             months.append(sheet)
     # Select Months
     selected_months = st.multiselect("Select months", months, default=months)
+    data = load_date_from_excel(workbooks, selected_months)
+elif stored_months:
+    st.info("Aucun fichier téléchargé: données chargées depuis le stockage local.")
+    selected_months = st.multiselect("Select months", stored_months, default=stored_months)
+    data = load_data_from_store(selected_months, utils.store_version("livraison"))
+else:
+    st.warning("Please upload an Excel file to proceed.")
+    st.stop()
 
-
-data = load_date_from_excel(excel_file, selected_months)
 if not data["success"]:
     st.warning(data["message"])
     st.stop()
 else:
     dfs = data["data"]
+    rollup = data["rollup"]
 
 st.divider()
 # ----------------------------------------------------------------------------
@@ -49,19 +72,20 @@ st.divider()
 fields = ["YEAR", "MOIS", "MOIS_NUM", "DATE", "LIVREUR", "T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE"]
 st.subheader("📊 État Global des Livraisons")
 st.space()
-st.dataframe(dfs[fields], width="stretch", hide_index=True)
+widgets.paginated_table(dfs[fields], "etat_global", search_column="LIVREUR", placeholder="Rechercher un livreur", width="stretch")
 st.divider()
 #
 # ---- Pivot Table Yearly
-dfs["YEAR"] = dfs["YEAR"].astype(str)
+rollup["YEAR"] = rollup["YEAR"].astype(str)
 year_pivot = pd.pivot_table(
-    dfs,
+    rollup,
     index=["YEAR", "MOIS"],
     values=["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE"],
     aggfunc="sum",
     margins=True, margins_name="Total Général",
     fill_value=0,
     sort=False,
+    observed=True,
 )
 st.markdown("##### 📋 Tableau Croisé des Livraisons par Année et Mois")
 st.dataframe(year_pivot, width="stretch")
@@ -69,13 +93,14 @@ st.divider()
 #
 # --- Pivot Table Mois Livreur---
 pivot = pd.pivot_table(
-    dfs,
+    rollup,
     index=["MOIS", "LIVREUR"],
     values=["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE"],
     aggfunc="sum",
     margins=True, margins_name="Total Général",
     fill_value=0,
     sort=False,
+    observed=True,
 )
 st.space()
 st.markdown("##### 📋 Tableau Croisé des Livraisons par Mois et Livreur")
@@ -85,8 +110,8 @@ st.dataframe(pivot, width="stretch")
 st.space()
 st.subheader("📈 Visualisation des Livraisons par Mois")
 chart_data = (
-    dfs
-    .groupby(["YEAR", "MOIS", "MOIS_NUM"], as_index=False)
+    rollup
+    .groupby(["YEAR", "MOIS", "MOIS_NUM"], as_index=False, observed=True)
     .agg(
         versement=("VERSEMENT", "sum"),
         commandes=("T. COMMANDE", "sum"),
@@ -95,7 +120,8 @@ chart_data = (
     .sort_values(["YEAR", "MOIS_NUM"])
     .set_index("MOIS")
 )
-chart_by_mois = px.histogram(
+chart_by_mois = utils.figure(
+    "histogram",
     chart_data,
     x=chart_data.index,
     y=["versement", "commandes", "charges"],
@@ -124,24 +150,16 @@ st.sidebar.divider()
 # ----------------------------------------------------------------------------
 # --- Etat par MOIS ---
 df_total_par_mois = (
-    dfs
-    .groupby(["YEAR", "MOIS_NUM", "MOIS"], as_index=False)
+    rollup
+    .groupby(["YEAR", "MOIS_NUM", "MOIS"], as_index=False, observed=True)
     .agg(
         versement=("VERSEMENT", "sum"),
         commandes=("T. COMMANDE", "sum"),
         charges=("CHARGE", "sum")
     )
-    .sort_values("YEAR")
 )
-# --- Calculate Deltas ---
-df_total_par_mois["delta_versement"] = df_total_par_mois["versement"].diff()
-df_total_par_mois["delta_commandes"] = df_total_par_mois["commandes"].diff()
-df_total_par_mois["delta_charges"] = df_total_par_mois["charges"].diff()
-
-# Pourcentage
-df_total_par_mois["delta_versement_pct"] = df_total_par_mois["versement"].pct_change() * 100
-df_total_par_mois["delta_commandes_pct"] = df_total_par_mois["commandes"].pct_change() * 100
-df_total_par_mois["delta_charges_pct"] = df_total_par_mois["charges"].pct_change() * 100
+# --- Calculate Deltas (month over month, in (YEAR, MOIS_NUM) order) ---
+df_total_par_mois = utils.add_deltas(df_total_par_mois, ["versement", "commandes", "charges"], fill=None)
 
 # --- Grand Total ---
 df_grand_total = pd.DataFrame({
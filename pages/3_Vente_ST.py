@@ -3,7 +3,6 @@
 # ----------------------------------------------------------------------------
 import pandas as pd
 import utils
-import plotly.express as px
 import streamlit as st
 import widgets
 
@@ -15,28 +14,53 @@ st.title("💱 _Vente_", text_alignment="center")
 st.space()
 
 
-@st.cache_data
-def load_data_multiple_excel(xls_files: list):
-    data = utils.read_sales_files(xls_files)
+@st.cache_data(hash_funcs={utils.Workbook: lambda workbook: workbook.digest})
+def load_data_multiple_excel(workbooks: list):
+    # Streams rows (stops at the totals), one process per file
+    data = utils.read_sales_files(workbooks, engine="stream", workers=None)
     return data
 
 
+@st.cache_data
+def load_data_from_store(store_version):
+    # store_version: reload when a new month is written in the store
+    return utils.read_sales_store()
+
+
+# --- Sections with their own inputs: a change reruns only the fragment, not the page ---
+@st.fragment
+def sfamilly_section(df, label, key=None):
+    famille = df.sort_values("Famille")["Famille"].unique()
+    # Two Columns
+    col1, col2 = st.columns(2)
+    selected_famille = col1.selectbox(label, famille, index=0, key=key)
+
+    st.space()
+    sfamille_selection = utils.select_rows(df, "Famille", selected_famille)
+    sfamilly_groupe, sfamilly_chart = utils.sfamilly_groupe(sfamille_selection)     # Get Famille DF, Famille Chart
+    widgets.table_chart_column(st, sfamilly_groupe, sfamilly_chart)     # Display table and chart side by side
+
+
 xls_files = st.file_uploader(
     "Télécharger les fichier Excel par Mois",
     accept_multiple_files=True,
     type=["xlsx"]
 )
 
-if not xls_files:
+if xls_files:
+    df_data_mois = load_data_multiple_excel([utils.Workbook(file) for file in xls_files])
+elif utils.store_version("vente"):
+    st.info("Aucun fichier téléchargé: ventes chargées depuis le stockage local.")
+    df_data_mois = load_data_from_store(utils.store_version("vente"))
+else:
     st.warning("Please upload Excel files to proceed.")
     st.stop()
+
+if df_data_mois["success"]:
+    df_mois = df_data_mois["df"]
 else:
-    df_data_mois = load_data_multiple_excel(xls_files)
-    if df_data_mois["success"]:
-        df_mois = df_data_mois["df"]
-    else:
-        st.warning(df_data_mois["message"])
-        st.stop()
+    st.warning(df_data_mois["message"])
+    st.stop()
 
 # Create Two Tabs
 global_tab, prevendeur_tab = st.tabs(
@@ -51,7 +75,9 @@ global_tab, prevendeur_tab = st.tabs(
 # global_tab.dataframe(df_mois)
 # -----------------------------------------------
 
-df_total_par_mois = utils.build_totals_mois(df_mois)
+# Product cube: every table below is a slice of it + a small roll-up, never a groupby of the raw rows
+df_cube = utils.build_product_cube(df_mois)
+df_total_par_mois = utils.build_totals_mois(df_cube)
 
 # --- Grand Total ---
 df_grand_total = pd.DataFrame({
@@ -77,21 +103,13 @@ for _, row in df_total_par_mois.iterrows():
 # ----------------------------
 # --- Total Par Prevendeur ---
 # ----------------------------
-df_total_prevendeur_mois = utils.build_totals_prevendeur_mois(df_mois)
+df_total_prevendeur_mois = utils.build_totals_prevendeur_mois(df_cube)
 # -----------------------------------------------
 # DEBUG
 # global_tab.dataframe(df_total_prevendeur_mois)
 # -----------------------------------------------
 
-pivot = df_total_prevendeur_mois.pivot_table(
-    index="PREVENDEUR",
-    columns="MOIS",
-    values=["livraison", "benefice"],
-    aggfunc="sum",
-    fill_value=0,
-    margins=True, margins_name="Totals",
-    sort=False
-)
+pivot = utils.pivot_prevendeur_mois(df_total_prevendeur_mois)
 global_tab.space()
 global_tab.subheader("📈 _Vue croisée Pré-vendeur / Mois_", divider="grey", width="content")
 global_tab.space()
@@ -115,29 +133,17 @@ global_tab.space()
 global_tab.subheader(f"{selected_month}", text_alignment="center", divider="grey")
 
 # DATAFRAME Totals PREVEUNDEUR Per Month
-df_selection_total_prev = df_total_prevendeur_mois[df_total_prevendeur_mois["MOIS"] == selected_month]
+df_selection_total_prev = utils.select_rows(df_total_prevendeur_mois, "MOIS", selected_month)
 # -------------------------------
 for _, row in df_selection_total_prev.iterrows():
     global_tab.markdown(f"##### 👤 {row['PREVENDEUR']}")
     widgets.display_prevendeur_totals(global_tab, row)
 
 # Prevendeur Livraison Chart
-total_livraison_chart = px.pie(
-    df_selection_total_prev,
-    names="PREVENDEUR",
-    values="livraison",
-    title="Livraison %",
-    template="plotly_white",
-)
+total_livraison_chart = utils.pie_chart(df_selection_total_prev, "PREVENDEUR", "livraison", title="Livraison %")
 
 # Prevendeur Bénéfice Chart
-total_benefice_chart = px.pie(
-    df_selection_total_prev,
-    names="PREVENDEUR",
-    values="benefice",
-    title="Bénéfice %",
-    template="plotly_white",
-)
+total_benefice_chart = utils.pie_chart(df_selection_total_prev, "PREVENDEUR", "benefice", title="Bénéfice %")
 global_tab.space()
 widgets.two_chart_columns(global_tab, total_livraison_chart, total_benefice_chart)
 global_tab.divider()
@@ -146,37 +152,16 @@ global_tab.divider()
 # === Tableau Des Produit Etat Générale ===
 # -----------------------------------------
 # DATAFRAME GENERAL MOIS
-df_selected_month = df_mois[df_mois["MOIS"] == selected_month]      # MOIS DATAFRAME
-df_produit = (
-    df_selected_month
-    .groupby(["Produit"], as_index=False)
-    .agg(
-        qte=("Quantité", "sum"),
-        livraison=("Total livraison (DA)", "sum"),
-        benefice=("Total bénéfice (DA)", "sum")
-    )
-    .sort_values("qte", ascending=False)
-    .rename(columns={"qte": "Quantité", "livraison": "Total Livraison", "benefice": "Total Bénéfice"})
-)
+df_selected_month = utils.select_rows(df_cube, "MOIS", selected_month)      # MOIS slice of the cube
+df_produit = utils.build_produits(df_selected_month)
 
 global_tab.space()
 global_tab.markdown("##### 🗃 Tableaux des Produit")
 global_tab.space()
 
-# --- Search Products
-input_col, space_col = global_tab.columns(2)
-search_product = input_col.text_input(
-    label="Search Product",
-    placeholder="Rechercher par produit",
-    key="search_products",
-    icon="🔎"
-)
-if search_product:
-    mask = df_produit["Produit"].astype(str).str.contains(search_product, case=False, na=False)
-    df_produit = df_produit[mask]
-
-# Display the Product Dataframe
-global_tab.dataframe(df_produit, hide_index=True)
+with global_tab:
+    # Search + sort + pages on the server, only the visible rows are sent
+    widgets.paginated_table(df_produit, "search_products", search_column="Produit", placeholder="Rechercher par produit")
 global_tab.divider()
 
 # ------------------------------------------
@@ -197,15 +182,8 @@ global_tab.space()
 global_tab.markdown("#### 📑 _Produit par Sous famille %_")
 global_tab.space()
 
-famille = df_selected_month.sort_values("Famille")["Famille"].unique()
-# Two Columns
-col1, col2 = global_tab.columns(2)
-selected_famille = col1.selectbox("Choisir la famille", famille, index=0, key="global_familly_selectbox")
-
-global_tab.space()
-sfamille_selection = df_selected_month[df_selected_month["Famille"] == selected_famille]
-sfamilly_groupe, sfamilly_chart = utils.sfamilly_groupe(sfamille_selection)     # Get Famille DF, Famille Chart
-widgets.table_chart_column(global_tab, sfamilly_groupe, sfamilly_chart)     # Display table and chart side by side
+with global_tab:
+    sfamilly_section(df_selected_month, "Choisir la famille", key="global_familly_selectbox")
 # -----------------------------------------------------------------------------------------------------------------
 #   === TAB PREVENDEUR DETAIL ===
 # -------------------------------
@@ -230,39 +208,16 @@ for _, row in df_selection_total_prev.iterrows():
         widgets.display_prevendeur_totals(prevendeur_tab, row)              # Display Total metric
 
 # --- Global Data Par Prevendeur ---
-df_prevendeur = df_selected_month[df_selected_month["PREVENDEUR"] == prevendeur]
+df_prevendeur = utils.select_rows(df_selected_month, "PREVENDEUR", prevendeur)
 #
 # --- Filter and Display Products ---
-df_produit_prev = (
-    df_selected_month
-    .groupby(["Produit", "PREVENDEUR"], as_index=False)
-    .agg(
-        qte=("Quantité", "sum"),
-        livraison=("Total livraison (DA)", "sum"),
-        benefice=("Total bénéfice (DA)", "sum")
-    )
-    .sort_values("qte", ascending=False)
-    .rename(columns={"qte": "Quantité", "livraison": "Total Livraison", "benefice": "Total Bénéfice"})
-)
-# DF Product Par Prevendeur
-df_produit_prev = df_produit_prev[df_produit_prev["PREVENDEUR"] == prevendeur]
+df_produit_prev = utils.build_produits(df_prevendeur, ("Produit", "PREVENDEUR"))     # DF Product Par Prevendeur
 
 prevendeur_tab.markdown("##### 🗃 Tableaux des Produit")
 prevendeur_tab.space()
 
-# Search Products
-input_col, space_col = prevendeur_tab.columns(2)
-search_product_prev = input_col.text_input(
-    label="Search Product",
-    placeholder="Rechercher par produit",
-    key="search_products_prev",
-    icon="🔎"
-)
-if search_product_prev:
-    mask = df_produit_prev["Produit"].astype(str).str.contains(search_product_prev, case=False, na=False)
-    df_produit_prev = df_produit_prev[mask]
-
-prevendeur_tab.dataframe(df_produit_prev, hide_index=True)      # Display DataFrame
+with prevendeur_tab:
+    widgets.paginated_table(df_produit_prev, "search_products_prev", search_column="Produit", placeholder="Rechercher par produit")
 prevendeur_tab.divider()
 
 # ----------------------------
@@ -283,12 +238,5 @@ prevendeur_tab.space()
 prevendeur_tab.markdown("#### 📑 _Produit par Sous famille %_")
 prevendeur_tab.space()
 
-famille = df_prevendeur.sort_values("Famille")["Famille"].unique()
-# Two Columns
-col1, col2 = prevendeur_tab.columns(2)
-selected_famille = col1.selectbox("Choisir le famille", famille, index=0)
-
-prevendeur_tab.space()
-sfamille_selection = df_prevendeur[df_prevendeur["Famille"] == selected_famille]
-sfamilly_groupe, sfamilly_chart = utils.sfamilly_groupe(sfamille_selection)     # Get Famille DF, Famille Chart
-widgets.table_chart_column(prevendeur_tab, sfamilly_groupe, sfamilly_chart)     # Display table and chart side by side
+with prevendeur_tab:
+    sfamilly_section(df_prevendeur, "Choisir le famille")
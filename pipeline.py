@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : TrizStock exports -> local store read by the dashboard (no merged xlsx, no upload)
+#   python pipeline.py ./triz_downloads --mois JANVIER --year 2026
+#   python pipeline.py ./triz_downloads --mois JANVIER --year 2026 --xlsx VENTE_JANVIER_2026.xlsx
+# ----------------------------------------------------------------------------
+import os
+import argparse
+
+import utils
+import triz_files
+from triz_config import PREVENDEURS
+
+SUMMARY_SHEET = "VENTE"         # Export of all the camions, first sheet of the merged workbook
+
+
+def run(input_folder, mois, year, prevendeurs=None, xlsx=None, engine="stream", workers=None):
+    """
+    Parse the <PREVENDEUR>.xlsx exports of one month once and write them in the store.
+    :prevendeurs: sheets to load, default triz_config.PREVENDEURS
+    :xlsx: also write the merged VENTE_<MOIS>_<YEAR>.xlsx workbook (same layout as before)
+    :return: {"success": True, "df": df} or {"success": False, "message": ...}
+    """
+    prevendeurs = list(prevendeurs or PREVENDEURS)
+    try:
+        exports = triz_files.files_by_sheet(input_folder, prevendeurs)
+    except ValueError as err:
+        return {"success": False, "message": str(err)}
+
+    result = utils.read_sales_exports(exports, year, mois, engine=engine, workers=workers, store=True)
+    if not result["success"]:
+        return result
+
+    if xlsx:
+        sheets = dict(exports)
+        try:
+            summary = triz_files.files_by_sheet(input_folder, [SUMMARY_SHEET])
+        except ValueError:
+            # read_sales_files skips the first sheet: keep one even without the summary export
+            print(f"[!] No {SUMMARY_SHEET} export, the first sheet of {xlsx} is a copy of the first prevendeur.")
+            summary = {SUMMARY_SHEET: next(iter(exports.values()))}
+        triz_files.merge_excels_with_sheetnames(input_folder, xlsx, {**summary, **sheets})
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python pipeline.py", description="Load TrizStock exports in the dashboard store.")
+    parser.add_argument("input_folder", help="folder with the <PREVENDEUR>.xlsx exports")
+    parser.add_argument("--mois", required=True, choices=utils.MONTHS_NAMES, type=str.upper)
+    parser.add_argument("--year", required=True, type=int)
+    parser.add_argument("--prevendeurs", nargs="+", help="default: " + " ".join(PREVENDEURS))
+    parser.add_argument("--xlsx", help="also write the merged workbook (e.g. VENTE_JANVIER_2026.xlsx)")
+    parser.add_argument("--engine", choices=utils.SALES_ENGINES, default="stream")
+    parser.add_argument("--workers", type=int, default=None, help="parsing processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    result = run(args.input_folder, args.mois, args.year, args.prevendeurs, args.xlsx, args.engine, args.workers)
+    if not result["success"]:
+        parser.exit(1, f"[✗] {result['message']}\n")
+
+    df = result["df"]
+    print(f"[✓] {len(df)} lignes ({', '.join(df['PREVENDEUR'].unique())}) -> {os.path.relpath(utils.STORE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : Static reports (HTML / xlsx) for every month x prevendeur, without Streamlit.
+#   python reports.py                                       # everything in the store -> ./reports
+#   python reports.py --year 2026 --mois JANVIER FEVRIER --format html
+#   python reports.py --vente VENTE_JANVIER_2026.xlsx --livraison LIVRAISON_2026.xlsx
+# ----------------------------------------------------------------------------
+import os
+import html
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import utils
+
+REPORTS_DIR = os.path.join(utils.BASE_DIR, "reports")
+ALL_PREVENDEURS = "TOUS"            # Report of the whole month (every prevendeur)
+FORMATS = ("html", "xlsx")
+LIVRAISON_FIELDS = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
+
+_DATA = {}                          # Dataset of the worker process, set once by _init_worker
+
+
+# ---------- LOAD ----------
+def load_vente(files=None):
+    """
+    Product cube and monthly totals, from the exports or the store.
+    """
+    result = utils.read_sales_files(files, engine="stream", workers=None, store=False) if files else utils.read_sales_store()
+    if not result["success"]:
+        return None
+    cube = utils.build_product_cube(result["df"])
+    return {
+        "cube": cube,
+        "totals_mois": utils.build_totals_mois(cube),
+        "totals_prevendeur": utils.build_totals_prevendeur_mois(cube),
+    }
+
+
+def load_livraison(files=None):
+    """
+    Daily rollup of every month, from the LIVRAISON_<YEAR>.xlsx files or the store.
+    """
+    if files:
+        months = sorted({sheet for file in files for sheet in utils.open_workbook(file).sheet_names if sheet in utils.mois_order})
+        result = utils.read_livraison_multi_year(files, months, workers=None, store=False)
+    else:
+        months = list(utils.store_partitions("livraison")["MOIS"].unique())
+        result = utils.read_livraison_store(months)
+    if not result["success"]:
+        return None
+    return {"rollup": utils.build_livraison_rollup(result["data"])}
+
+
+# ---------- RENDER ----------
+def _fmt(value):
+    return f"{value:,.2f}".replace(",", " ")
+
+
+def _index(df):
+    # Keep only meaningful indexes (DATE, LIVREUR, ...), not the row numbers of a groupby
+    return any(name is not None for name in df.index.names)
+
+
+def write_html(path, title, sections):
+    """
+    :sections: [(heading, DataFrame | plotly Figure)]
+    """
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    plotlyjs = "cdn"                            # Loaded by the first chart only
+    for heading, content in sections:
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        if isinstance(content, (pd.DataFrame, pd.Series)):
+            parts.append(content.to_html(float_format=_fmt, border=0, classes="table", index=_index(content)))
+        else:
+            parts.append(content.to_html(full_html=False, include_plotlyjs=plotlyjs))
+            plotlyjs = False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title>"
+            "<style>body{font-family:sans-serif;margin:2em} .table{border-collapse:collapse}"
+            " .table td,.table th{padding:4px 10px;border-bottom:1px solid #ddd;text-align:right}</style>"
+            "</head><body>" + "\n".join(parts) + "</body></html>"
+        )
+
+
+def write_xlsx(path, sections):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for heading, content in sections:
+            if isinstance(content, (pd.DataFrame, pd.Series)):
+                content.to_excel(writer, sheet_name=heading[:31], index=_index(content))
+
+
+def _write(folder, name, title, sections, formats):
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    if "html" in formats:
+        paths.append(os.path.join(folder, f"{name}.html"))
+        write_html(paths[-1], title, sections)
+    if "xlsx" in formats:
+        paths.append(os.path.join(folder, f"{name}.xlsx"))
+        write_xlsx(paths[-1], sections)
+    return paths
+
+
+# ---------- REPORTS (run in the workers) ----------
+def vente_report(year, mois, prevendeur, output, formats):
+    vente = _DATA["vente"]
+    df_month = utils.select_rows(utils.select_rows(vente["cube"], "YEAR", year), "MOIS", mois)
+    if prevendeur == ALL_PREVENDEURS:
+        df = df_month
+        totals = vente["totals_mois"]
+    else:
+        df = utils.select_rows(df_month, "PREVENDEUR", prevendeur)
+        totals = utils.select_rows(vente["totals_prevendeur"], "PREVENDEUR", prevendeur)
+    totals = totals[(totals["YEAR"] == year) & (totals["MOIS"] == mois)]
+
+    familles, familles_chart = utils.familly_groupe(df)
+    sections = [
+        ("Totaux", totals.drop(columns=["MOIS_NUM"])),
+        ("Produits", utils.build_produits(df)),
+        ("Familles", familles),
+        ("Produits par famille", familles_chart),
+    ]
+    if prevendeur == ALL_PREVENDEURS:
+        month_prev = utils.select_rows(utils.select_rows(vente["totals_prevendeur"], "YEAR", year), "MOIS", mois)
+        sections.insert(1, ("Prevendeurs", month_prev.drop(columns=["MOIS_NUM"])))
+        sections.append(("Livraison par prevendeur", utils.pie_chart(month_prev, "PREVENDEUR", "livraison", title="Livraison %")))
+
+    folder = os.path.join(output, str(year), mois)
+    return _write(folder, f"VENTE_{prevendeur}", f"Vente {prevendeur} - {mois} {year}", sections, formats)
+
+
+def livraison_report(year, mois, output, formats):
+    rollup = _DATA["livraison"]["rollup"]
+    df = utils.select_rows(utils.select_rows(rollup, "YEAR", year), "MOIS", mois)
+
+    etat = pd.DataFrame(utils.etat_excel_like_db(df).items(), columns=["TYPE", "MONTANT"])
+    etat_journalier = pd.pivot_table(
+        df, index="DATE", values=LIVRAISON_FIELDS, aggfunc="sum",
+        margins=True, margins_name="TOTAL", fill_value=0, sort=False, observed=True,
+    )
+    livreurs = df["LIVREUR"].unique()
+    _, retours = utils.driver_retour(df)
+    sections = [
+        ("Etat Mensuel", etat),
+        ("Etat Mensuel %", utils.pie_chart(etat.assign(MONTANT=etat["MONTANT"].abs()), "TYPE", "MONTANT")),
+        ("Etat Journalier", etat_journalier),
+        ("Par Livreur", utils.sum_by_driver(df, LIVRAISON_FIELDS, livreur_selection=livreurs)),
+        ("Retours", retours),
+    ]
+    folder = os.path.join(output, str(year), mois)
+    return _write(folder, "LIVRAISON", f"Livraison - {mois} {year}", sections, formats)
+
+
+def _init_worker(data):
+    _DATA.update(data)
+
+
+def _run(job):
+    func, args = job
+    return globals()[func](*args)
+
+
+# ---------- MAIN ----------
+def plan_jobs(data, output, formats, years=None, months=None):
+    """
+    [(report function name, args)] for every month (x prevendeur) of the loaded data.
+    """
+    months = {utils.canonical_month(mois) for mois in months or ()}     # FÉVRIER in the data, FEVRIER asked
+
+    def wanted(year, mois):
+        return (not years or year in years) and (not months or utils.canonical_month(mois) in months)
+
+    jobs = []
+    if data.get("vente"):
+        cube = data["vente"]["cube"]
+        for (year, mois), prevendeurs in cube.groupby(["YEAR", "MOIS"], observed=True)["PREVENDEUR"]:
+            if wanted(year, mois):
+                for prevendeur in [ALL_PREVENDEURS, *prevendeurs.unique()]:
+                    jobs.append(("vente_report", (year, mois, prevendeur, output, formats)))
+    if data.get("livraison"):
+        rollup = data["livraison"]["rollup"]
+        for year, mois in rollup.groupby(["YEAR", "MOIS"], observed=True).size().index:
+            if wanted(year, mois):
+                jobs.append(("livraison_report", (year, mois, output, formats)))
+    return jobs
+
+
+def generate(data, output=REPORTS_DIR, formats=FORMATS, years=None, months=None, workers=None):
+    """
+    Render every report, the dataset is sent once to each worker process.
+    :return: list of the written files
+    """
+    jobs = plan_jobs(data, output, formats, years, months)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        _init_worker(data)
+        return [path for job in jobs for path in _run(job)]
+
+    # Same start method as utils.map_files: workers come from a clean process
+    context = utils.process_context([__name__])
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(data,)) as executor:
+        return [path for paths in executor.map(_run, jobs, chunksize=4) for path in paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python reports.py", description="Render the monthly reports to HTML / xlsx.")
+    parser.add_argument("--kind", choices=["vente", "livraison", "all"], default="all")
+    parser.add_argument("--vente", nargs="+", help="VENTE_<MOIS>_<YEAR>.xlsx files (default: the store)")
+    parser.add_argument("--livraison", nargs="+", help="LIVRAISON_<YEAR>.xlsx files (default: the store)")
+    parser.add_argument("--year", nargs="+", type=int, help="only these years")
+    parser.add_argument("--mois", nargs="+", type=utils.canonical_month, choices=utils.MONTHS_NAMES, help="only these months")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--output", default=REPORTS_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    data = {}
+    if args.kind in ("vente", "all"):
+        data["vente"] = load_vente(args.vente)
+    if args.kind in ("livraison", "all"):
+        data["livraison"] = load_livraison(args.livraison)
+    if not any(data.values()):
+        parser.exit(1, "[✗] Aucune donnée: chargez des fichiers ou remplissez le stockage.\n")
+
+    paths = generate(data, args.output, args.format, args.year, args.mois, args.workers)
+    print(f"[✓] {len(paths)} fichiers dans {args.output} ({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : Incremental TrizStock sync (no browser): only the days missing from the manifest
+#                 are exported, in monthly chunks, then the touched months are rebuilt in the store.
+#   python sync.py                                          # nightly: current month, today and yesterday refreshed
+#   python sync.py --since 2025-01-01 --until 2025-12-31    # backfill a year (resumable)
+# ----------------------------------------------------------------------------
+import os
+import json
+import hashlib
+import argparse
+import datetime
+
+import utils
+import triz_http
+from triz_config import PREVENDEURS
+
+MANIFEST_FILE = os.path.join(utils.BASE_DIR, ".cache", "sync_manifest.json")
+DOWNLOAD_DIR = os.path.join(utils.BASE_DIR, "triz_downloads", "sync")
+TRIZ_DATE_FORMAT = "%d-%m-%Y"       # dated / datef of PRODUIT_SORTIE_URL
+MONTH_NAMES = {num: name for name, num in utils.MONTHS_NAMES.items()}
+REFRESH_DAYS = 2                    # Today and yesterday: a run after midnight still completes the day before
+
+
+# ---------- MANIFEST ----------
+# {"windows": {PREVENDEUR: [{"dated": "2026-01-01", "datef": "2026-01-31", "file": ..., "sha256": ..., "fetched": ...}]}}
+# The windows of a prevendeur never overlap: the export of a window holds the totals of its days.
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"windows": {}}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    # Written after every window: a crash loses at most the download in progress
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def _day(value):
+    return datetime.date.fromisoformat(value)
+
+
+def _days(first, last):
+    return [first + datetime.timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def covered_days(windows):
+    return {day for window in windows for day in _days(_day(window["dated"]), _day(window["datef"]))}
+
+
+def provisional(window):
+    # Exported on or before its last day: that day was still open, the window is fetched again
+    return window["fetched"][:10] <= window["datef"]
+
+
+# ---------- PLAN ----------
+def plan_windows(windows, since, until, refresh=()):
+    """
+    Windows (first_day, last_day) to export for one prevendeur.
+    :windows: windows already in the manifest
+    :refresh: days exported again even if present (still changing), one window per day
+    Missing days are grouped in runs of consecutive days, cut at every month end.
+    Provisional windows (see provisional) count as missing.
+    """
+    refresh = {day for day in refresh if since <= day <= until}
+    # A window of several days holding a refreshed day is exported again as a whole
+    kept = [
+        w for w in windows
+        if not provisional(w) and (w["dated"] == w["datef"] or not refresh & covered_days([w]))
+    ]
+    covered = covered_days(kept) - refresh
+
+    plan = [(day, day) for day in sorted(refresh)]
+    run = []
+    for day in _days(since, until):
+        if day in covered or day in refresh or (run and day.month != run[-1].month):
+            if run:
+                plan.append((run[0], run[-1]))
+            run = []
+        if day not in covered and day not in refresh:
+            run.append(day)
+    if run:
+        plan.append((run[0], run[-1]))
+    return sorted(plan)
+
+
+def _drop_overlapping(windows, first, last):
+    return [w for w in windows if _day(w["datef"]) < first or _day(w["dated"]) > last]
+
+
+def _refresh_days(until, refresh_days):
+    today = datetime.date.today()
+    return [today - datetime.timedelta(days=n) for n in range(refresh_days) if today - datetime.timedelta(days=n) <= until]
+
+
+def _force_range(windows, since, until):
+    # Windows partly in the forced range are dropped entirely: extend the range to them
+    for window in windows:
+        if _day(window["datef"]) >= since and _day(window["dated"]) <= until:
+            since, until = min(since, _day(window["dated"])), max(until, _day(window["datef"]))
+    return since, until
+
+
+# ---------- FETCH ----------
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_window(session, prevendeur, first, last):
+    """
+    Export one window of one camion -> manifest entry.
+    """
+    folder = os.path.join(session.download_dir, prevendeur)
+    os.makedirs(folder, exist_ok=True)
+    path = triz_http.download_etat_prevendeur(
+        session, first.strftime(TRIZ_DATE_FORMAT), last.strftime(TRIZ_DATE_FORMAT),
+        camion=triz_http.CAMIONS[prevendeur],
+        filename=os.path.join(prevendeur, f"{first.isoformat()}_{last.isoformat()}"),
+    )
+    return {
+        "dated": first.isoformat(),
+        "datef": last.isoformat(),
+        "file": os.path.relpath(path, session.download_dir),
+        "sha256": _sha256(path),
+        "fetched": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def sync(session, since, until, prevendeurs=None, refresh_days=REFRESH_DAYS, force=False, manifest_file=MANIFEST_FILE):
+    """
+    Export the missing / refreshed windows of every prevendeur and record them in the manifest.
+    :refresh_days: last days exported again, even before since (yesterday on the 1st of the month)
+    :return: {PREVENDEUR: set of (year, month) whose data changed}
+    """
+    manifest = load_manifest(manifest_file)
+    refresh = _refresh_days(until, refresh_days)
+    since = min([since, *refresh])
+    changed = {}
+    for prev in prevendeurs or PREVENDEURS:
+        windows = manifest["windows"].setdefault(prev, [])
+        first, last = since, until
+        if force:
+            first, last = _force_range(windows, since, until)
+            windows[:] = _drop_overlapping(windows, first, last)
+
+        plan = plan_windows(windows, first, last, refresh)
+        print(f"[+] {prev}: {len(plan)} export(s) to fetch.")
+        for dated, datef in plan:
+            old = [w for w in windows if w["dated"] == dated.isoformat() and w["datef"] == datef.isoformat()]
+            entry = fetch_window(session, prev, dated, datef)
+            kept = _drop_overlapping(windows, dated, datef)
+            for window in windows:
+                if window not in kept and window["file"] != entry["file"]:
+                    _remove(os.path.join(session.download_dir, window["file"]))
+            windows[:] = kept + [entry]
+            windows.sort(key=lambda w: w["dated"])
+            save_manifest(manifest, manifest_file)
+            if not old or old[0]["sha256"] != entry["sha256"]:
+                changed.setdefault(prev, set()).add((dated.year, dated.month))
+    return changed
+
+
+# ---------- STORE ----------
+def month_files(manifest, prevendeur, year, month, download_dir=DOWNLOAD_DIR, until=None):
+    """
+    Files of the windows of one month, None while a day of the month (up to until) is missing.
+    """
+    first = datetime.date(year, month, 1)
+    last = (first + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+    if until:
+        last = min(last, until)
+    windows = [
+        w for w in manifest["windows"].get(prevendeur, [])
+        if _day(w["dated"]).year == year and _day(w["dated"]).month == month
+    ]
+    if not set(_days(first, last)) <= covered_days(windows):
+        return None
+    return [os.path.join(download_dir, w["file"]) for w in windows]
+
+
+def update_store(changed, until, manifest_file=MANIFEST_FILE, download_dir=DOWNLOAD_DIR):
+    """
+    Rebuild the store partitions of the changed months (window totals added per product).
+    """
+    manifest = load_manifest(manifest_file)
+    months = sorted({month for months in changed.values() for month in months})
+    for year, month in months:
+        exports = {}
+        for prev, prev_months in changed.items():
+            if (year, month) not in prev_months:
+                continue
+            files = month_files(manifest, prev, year, month, download_dir, until)
+            if files is None:
+                print(f"[!] {prev} {MONTH_NAMES[month]} {year}: month incomplete, not stored.")
+                continue
+            exports[prev] = files
+        if not exports:
+            continue
+        result = utils.read_sales_exports(exports, year, MONTH_NAMES[month], store=True)
+        if not result["success"]:
+            return result
+        print(f"[✓] {MONTH_NAMES[month]} {year}: {', '.join(exports)} -> store")
+    return {"success": True, "message": f"{len(months)} mois mis à jour."}
+
+
+def main(argv=None):
+    today = datetime.date.today()
+    parser = argparse.ArgumentParser(prog="python sync.py", description="Incremental TrizStock export into the dashboard store.")
+    parser.add_argument("--since", type=datetime.date.fromisoformat, default=today.replace(day=1), help="first day, YYYY-MM-DD")
+    parser.add_argument("--until", type=datetime.date.fromisoformat, default=today, help="last day, YYYY-MM-DD")
+    parser.add_argument("--prevendeurs", nargs="+", choices=PREVENDEURS, default=PREVENDEURS)
+    parser.add_argument("--refresh-days", type=int, default=REFRESH_DAYS, help="last days exported again (still changing)")
+    parser.add_argument("--force", action="store_true", help="export the whole range again")
+    parser.add_argument("--no-store", action="store_true", help="only download, don't update the store")
+    parser.add_argument("--download-dir", default=DOWNLOAD_DIR)
+    parser.add_argument("--manifest", default=MANIFEST_FILE)
+    args = parser.parse_args(argv)
+
+    import dotenv
+    dotenv.load_dotenv(dotenv.find_dotenv())
+    session = triz_http.create_driver(args.download_dir)
+    result = triz_http.login(session, os.getenv("triz_username"), os.getenv("triz_password"))
+    print(result["message"])
+    if not result["success"]:
+        parser.exit(1)
+
+    changed = sync(session, args.since, args.until, args.prevendeurs, args.refresh_days, args.force, args.manifest)
+    if not args.no_store:
+        result = update_store(changed, args.until, args.manifest, session.download_dir)
+        if not result["success"]:
+            parser.exit(1, f"[✗] {result['message']}\n")
+
+
+if __name__ == '__main__':
+    main()
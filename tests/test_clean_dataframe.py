@@ -0,0 +1,31 @@
+import os
+import sys
+import datetime
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils                                        # noqa: E402
+
+
+def raw_sheet():
+    return pd.DataFrame({
+        "DATE": [datetime.datetime(2026, 1, 5), "06/01/2026", None, "TOTAL 2025"],
+        "LIVREUR": ["ALI", "ALI", None, None],
+        "T. COMMANDE": [100, 200, None, 300],
+    })
+
+
+def test_invalid_date_rows_are_dropped_and_reported():
+    with pytest.warns(UserWarning, match="TOTAL 2025"):
+        result = utils.clean_dataframe(raw_sheet())
+    assert result["success"]
+    assert list(result["df"]["DATE"]) == [datetime.date(2026, 1, 5), datetime.date(2026, 1, 6)]
+    assert "ligne 5" in result["warning"]
+    assert result["df"].attrs["warning"] == result["warning"]
+
+
+def test_clean_sheet_has_no_warning():
+    result = utils.clean_dataframe(raw_sheet().iloc[:3])
+    assert result["success"] and "warning" not in result
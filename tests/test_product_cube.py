@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils                                        # noqa: E402
+
+
+def sales_rows():
+    # Two months, a blank Sous famille and a blank Produit (kept by the TrizStock export)
+    return utils.apply_schema(pd.DataFrame({
+        "YEAR": [2026] * 5,
+        "MOIS": ["JANVIER", "JANVIER", "JANVIER", "FEVRIER", "FEVRIER"],
+        "MOIS_NUM": [1, 1, 1, 2, 2],
+        "PREVENDEUR": ["WALID", "WALID", "FETHI", "WALID", "FETHI"],
+        "Famille": ["BOISSONS", "BOISSONS", "BOISSONS", "GATEAUX", "GATEAUX"],
+        "Sous famille": ["EAU", np.nan, "EAU", "BISCUIT", np.nan],
+        "Produit": ["Eau 1.5L", "Eau 0.5L", np.nan, "Biscuit", "Gaufrette"],
+        "Quantité": [10, 20, 30, 40, 50],
+        "Total livraison (DA)": [100.0, 200.0, 300.0, 400.0, 500.0],
+        "Total bénéfice (DA)": [10.0, 20.0, 30.0, 40.0, 50.0],
+    }), utils.VENTE_CATEGORIES)
+
+
+def test_product_cube_keeps_blank_keys():
+    df_mois = sales_rows()
+    cube = utils.build_product_cube(df_mois)
+    pd.testing.assert_series_equal(cube[utils.FAMILLE_FIELDS].sum(), df_mois[utils.FAMILLE_FIELDS].sum())
+    assert len(cube) == len(df_mois)
+
+
+def test_totals_from_cube_match_raw_rows():
+    df_mois = sales_rows()
+    totals = utils.build_totals_mois(utils.build_product_cube(df_mois))
+    assert totals["livraison"].sum() == df_mois["Total livraison (DA)"].sum()
+    assert totals["benefice"].sum() == df_mois["Total bénéfice (DA)"].sum()
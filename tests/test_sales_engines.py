@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils                                        # noqa: E402
+
+HEADER = ["Famille", "Sous famille", "Produit", "Quantité", "Prix unitaire", "Quantité",
+          "Total livraison (DA)", "Total bénéfice (DA)"]
+
+
+@pytest.fixture
+def vente_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_DIR", str(tmp_path / "cache"))
+    wb = Workbook()
+    wb.active.title = "VENTE"
+    ws = wb.create_sheet("WALID")
+    for _ in range(14):
+        ws.append(["TRIZSTOCK"])
+    ws.append(HEADER)
+    ws.append(["BOISSONS", "EAU", "Eau 1.5L", 12, 40, 10, 400.0, 40.0])
+    ws.append([None, None, "Sous-total BOISSONS", None, None, 10, 400.0, 40.0])    # Blank Famille mid-table
+    ws.append(["GATEAUX", "BISCUIT", "Biscuit", 22, 50, 20, 1000.0, 100.0])
+    ws.append([None, None, "TOTAL", None, None, 30, 1400.0, 140.0])
+    ws.append([])
+    ws.append([None, None, "Imprimé par TrizStock"])
+    path = tmp_path / "VENTE_JANVIER_2026.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+def test_engines_read_past_a_blank_famille(vente_file):
+    expected = utils.read_sales_files(vente_file, engine="openpyxl", store=False)
+    assert expected["success"], expected.get("message")
+    assert list(expected["df"]["Produit"]) == ["Eau 1.5L", "Biscuit"]
+
+    engines = ["stream"]
+    try:
+        import python_calamine                      # noqa: F401
+        engines.append("calamine")
+    except ImportError:
+        pass
+    for engine in engines:
+        result = utils.read_sales_files(vente_file, engine=engine, store=False)
+        assert result["success"], result.get("message")
+        pd.testing.assert_frame_equal(result["df"], expected["df"])
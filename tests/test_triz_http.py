@@ -0,0 +1,136 @@
+import io
+import os
+import sys
+import uuid
+import threading
+import http.server
+from urllib.parse import urlparse, parse_qs
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import triz_http                                    # noqa: E402
+from triz_config import EXCEL_BUTTON_ID             # noqa: E402
+
+PASSWORD = "secret"
+LOGIN_PAGE = """<html><body>
+<form id="loginForm" action="/trizstock/j_security_check" method="post">
+<input id="j_username" name="j_username" type="text"><input id="j_password" name="j_password" type="password">
+<input type="hidden" name="javax.faces.ViewState" value="vs-login">
+<button type="submit" name="go" value="1">OK</button>
+</form>%s</body></html>"""
+LOGIN_ERROR = '<div><span class="ui-messages-error-summary">Identifiants invalides</span></div>'
+EXPORT_PAGE = """<html><body>
+<form id="j_idt545" action="/trizstock/faces/view/livraison/listDetailProduitSortieN.xhtml" method="post">
+<input type="hidden" name="j_idt545" value="j_idt545">
+<input type="hidden" name="camion" value="%(camion)s">
+<input type="hidden" name="javax.faces.ViewState" value="vs-export">
+<select name="statut"><option value="tous">Tous</option><option value="livrer" selected>Livré</option></select>
+<select name="depot"><option>Principal<option>Annexe</select>
+<textarea name="note">A livrer</textarea>
+<input type="checkbox" name="detail" checked><input type="checkbox" name="archive" value="1">
+<input type="radio" name="tri" value="produit" checked><input type="radio" name="tri" value="famille">
+<button id="%(button)s" name="%(button)s" type="submit">Excel</button>
+</form></body></html>"""
+EXPECTED_FIELDS = {
+    "j_idt545": "j_idt545", "javax.faces.ViewState": "vs-export", "statut": "livrer", "depot": "Principal",
+    "note": "A livrer", "detail": "on", "tri": "produit",
+}
+
+
+def export_bytes(camion):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for _ in range(14):
+        ws.append(["TRIZSTOCK"])
+    ws.append(["Famille", "Sous famille", "Produit", "Quantité", "Prix unitaire", "Quantité",
+               "Total livraison (DA)", "Total bénéfice (DA)"])
+    ws.append(["BOISSONS", "EAU", f"Eau {camion}", 1, 2, 3, 4.5, 1.5])
+    ws.append([None, None, "TOTAL", None, None, 3, 4.5, 1.5])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+class TrizHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Stand-in TrizStock server: session cookie, login form, export page posting the Excel file.
+    """
+    sessions = {}
+    posted = []
+
+    def log_message(self, *args):
+        pass
+
+    def _session(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "JSESSIONID":
+                return value
+        return None
+
+    def _send(self, body, content_type="text/html", headers=()):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        session = self._session()
+        if url.path.endswith("login.xhtml"):
+            session = session or uuid.uuid4().hex
+            self.sessions.setdefault(session, False)
+            return self._send((LOGIN_PAGE % "").encode(), headers=[("Set-Cookie", f"JSESSIONID={session}; Path=/")])
+        if not self.sessions.get(session):
+            return self._send((LOGIN_PAGE % "").encode())
+        camion = parse_qs(url.query).get("camion", [""])[0]
+        self._send((EXPORT_PAGE % {"camion": camion, "button": EXCEL_BUTTON_ID}).encode())
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        data = {name: values[0] for name, values in parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode()).items()}
+        session = self._session()
+        if url.path.endswith("j_security_check"):
+            if data.get("j_password") == PASSWORD and session in self.sessions:
+                self.sessions[session] = True
+                return self._send(b"<html>Accueil</html>")
+            return self._send((LOGIN_PAGE % LOGIN_ERROR).encode())
+        self.posted.append(data)
+        disposition = 'attachment; filename="listDetailProduitSortie.xlsx"'
+        self._send(export_bytes(data.get("camion", "")), "application/vnd.ms-excel", [("Content-Disposition", disposition)])
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TrizHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/trizstock"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_form_data_like_a_browser():
+    form = triz_http._form_with(triz_http._parse(EXPORT_PAGE % {"camion": "", "button": EXCEL_BUTTON_ID}), EXCEL_BUTTON_ID)
+    assert triz_http._form_data(form) == {"camion": "", **EXPECTED_FIELDS}
+
+
+def test_login_failure(server, tmp_path):
+    session = triz_http.create_driver(tmp_path, base_url=server)
+    result = triz_http.login(session, "user", "wrong")
+    assert not result["success"]
+    assert "Identifiants invalides" in result["message"]
+
+
+def test_login_and_download(server, tmp_path):
+    session = triz_http.create_driver(tmp_path, base_url=server)
+    assert triz_http.login(session, "user", PASSWORD)["success"]
+
+    path = triz_http.download_etat_prevendeur(session, "01-01-2026", "31-01-2026", "8442-0000005", filename="WALID")
+    assert path == os.path.join(str(tmp_path), "WALID.xlsx")
+    assert openpyxl.load_workbook(path).active.cell(16, 3).value == "Eau 8442-0000005"
+    assert TrizHandler.posted[-1] == {"camion": "8442-0000005", EXCEL_BUTTON_ID: EXCEL_BUTTON_ID, **EXPECTED_FIELDS}
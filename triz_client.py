@@ -5,27 +5,38 @@
 # created       :
 # desc          :
 # ----------------------------------------------------------------------------
-# import time
+import time
 import os
-import pandas as pd
+import json
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import undetected_chromedriver as uc
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException     # , StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, WebDriverException     # , StaleElementReferenceException
 
 # ---------- CONFIG SETUP ----------
-BASE_URL = "http://51.255.79.241:8080/trizstock"
-LOGIN_URL = f"{BASE_URL}/faces/login.xhtml"
-DEFAULT_TIMEOUT = 20
-PRODUIT_SORTIE_URL = f"{BASE_URL}/faces/view/livraison/listDetailProduitSortieN.xhtml"
+from triz_config import (                       # noqa: E402  (re-exported, shared with triz_http)
+    BASE_URL, LOGIN_URL, DEFAULT_TIMEOUT, PRODUIT_SORTIE_URL, EXCEL_BUTTON_ID, CAMIONS, PREVENDEURS,
+)
+from triz_files import files_by_sheet, merge_excels_with_sheetnames     # noqa: E402  (re-exported)
+
+PROBE_URL = f"{BASE_URL}/"                      # Redirects to LOGIN_URL when the session is gone
+COOKIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "triz_cookies.json")
+DOWNLOAD_TIMEOUT = 120
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")     # Chrome / Firefox files still being written
+_DRIVER_LOCK = threading.Lock()                         # uc patches chromedriver: create drivers one by one
 
 
 # ---------- DRIVER SETUP ----------
-def create_driver(headless: bool = False, chrome_version=143, download_dir="./triz_downloads"):
+def create_driver(headless: bool = False, chrome_version=143, download_dir="./triz_downloads", profile_dir=None):
     """
+    :profile_dir: Chrome profile kept between runs (cookies included), None = temporary profile
     :return: driver
     """
     os.makedirs(download_dir, exist_ok=True)    # Create download dir if it doesn't exist
@@ -41,11 +52,20 @@ def create_driver(headless: bool = False, chrome_version=143, download_dir="./tr
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument(f"--unsafely-treat-insecure-origin-as-secure={BASE_URL}")
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
 
-    return uc.Chrome(version_main=chrome_version, options=options, headless=headless)
+    with _DRIVER_LOCK:
+        driver = uc.Chrome(version_main=chrome_version, options=options, headless=headless)
+    driver.download_dir = download_dir
+    return driver
 
 
 # ---------- LOGIN ----------
+def _on_login_page(driver):
+    return "login.xhtml" in driver.current_url or bool(driver.find_elements(By.ID, "j_username"))
+
+
 def login(driver, username: str, password: str, timeout: int = DEFAULT_TIMEOUT) -> bool:
     print("[+] Login...")
 
@@ -63,25 +83,111 @@ def login(driver, username: str, password: str, timeout: int = DEFAULT_TIMEOUT)
     pass_input.send_keys(password)
     pass_input.send_keys(Keys.ENTER)
 
-    # ---- wait for either success OR error (shorter wait) ----
-    short_wait = WebDriverWait(driver, 5)
-
+    # ---- wait for the page after login OR the error box, whichever comes first ----
     try:
-        error_box = short_wait.until(
-            EC.visibility_of_element_located((By.ID, "errorMessages"))
-        )
-        msg = error_box.find_element(By.CLASS_NAME, "ui-messages-error-summary").text
+        wait.until(EC.any_of(
+            lambda d: "login.xhtml" not in d.current_url,
+            EC.visibility_of_element_located((By.ID, "errorMessages")),
+        ))
+    except TimeoutException:
+        return {"success": False, "message": f"[✗] Login failed: no answer after {timeout}s."}
+
+    # Whatever the URL (login.xhtml, j_security_check...): an error box or the login form again = failure
+    error_boxes = [box for box in driver.find_elements(By.ID, "errorMessages") if box.is_displayed()]
+    if error_boxes:
+        summaries = error_boxes[0].find_elements(By.CLASS_NAME, "ui-messages-error-summary")
+        msg = (summaries[0] if summaries else error_boxes[0]).text
         return {"success": False, "message": f"[✗] Login failed: {msg}"}
+    if driver.find_elements(By.ID, "j_username") or driver.find_elements(By.ID, "j_password"):
+        return {"success": False, "message": "[✗] Login failed."}       # Login page again
+    return {"success": True, "message": "[✓] Login successful."}
 
-    except TimeoutException:
-        return {"success": True, "message": "[✓] Login successful."}
+
+# ---------- SESSION ----------
+def session_alive(driver, timeout: int = DEFAULT_TIMEOUT) -> bool:
+    """
+    Cheap probe: open PROBE_URL, the server sends us back to the login page when the session expired.
+    """
+    driver.get(PROBE_URL)
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    return not _on_login_page(driver)
+
+
+def save_session(driver, cookies_file=COOKIES_FILE):
+    os.makedirs(os.path.dirname(cookies_file), exist_ok=True)
+    # One tmp file per call (mode 0600): the threads of download_all_etats_parallel save concurrently
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(cookies_file), suffix=".tmp")
+    with open(fd, "w") as f:
+        json.dump(driver.get_cookies(), f)
+    os.replace(tmp_file, cookies_file)
+
+
+def restore_session(driver, cookies_file=COOKIES_FILE, timeout: int = DEFAULT_TIMEOUT) -> bool:
+    """
+    Load the saved cookies in the driver and check them with session_alive.
+    """
+    try:
+        with open(cookies_file, encoding="utf-8") as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    driver.get(LOGIN_URL)           # Cookies can only be added on a page of their domain
+    for cookie in cookies:
+        if cookie.get("expiry") and cookie["expiry"] < time.time():
+            continue                # Expired, the server would not accept it anyway
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException:
+            continue
+    return session_alive(driver, timeout)
+
+
+def ensure_login(driver, username: str, password: str, cookies_file=COOKIES_FILE, timeout: int = DEFAULT_TIMEOUT):
+    """
+    Reuse the saved session when the server still accepts it, else login and save the new cookies.
+    """
+    if restore_session(driver, cookies_file, timeout):
+        return {"success": True, "message": "[✓] Session restored."}
+
+    result = login(driver, username, password, timeout)
+    if result["success"]:
+        save_session(driver, cookies_file)
+    return result
 
 
 # ---------- DOWNLOAD EXCEL FILE ----------
-def download_etat_prevendeur(driver, dated, datef, camion):
+def wait_for_download(download_dir, before, timeout=DOWNLOAD_TIMEOUT, poll=0.5):
+    """
+    Wait until a new, finished file is in download_dir (no partial file left, size stable).
+    :before: set of the file names present before the download started
+    :return: path of the new file
+    """
+    deadline = time.monotonic() + timeout
+    sizes = {}
+    while time.monotonic() < deadline:
+        names = set(os.listdir(download_dir)) - set(before)
+        partial = [name for name in names if name.endswith(PARTIAL_SUFFIXES)]
+        done = [name for name in names if not name.endswith(PARTIAL_SUFFIXES) and not name.startswith(".")]
+        if done and not partial:
+            path = os.path.join(download_dir, sorted(done)[0])
+            size = os.path.getsize(path)
+            if size and sizes.get(path) == size:
+                return path
+            sizes[path] = size
+        time.sleep(poll)
+    raise TimeoutException(f"[✗] Download not finished after {timeout}s in {download_dir}")
+
+
+def download_etat_prevendeur(driver, dated, datef, camion, prevendeur=None, timeout=DOWNLOAD_TIMEOUT):
     """
     This function will download the Excel File
+    :prevendeur: rename the downloaded file <prevendeur>.<ext>
+    :return: path of the downloaded file
     """
+    download_dir = getattr(driver, "download_dir", os.path.abspath("./triz_downloads"))
+    before = set(os.listdir(download_dir))
+
     wait = WebDriverWait(driver, DEFAULT_TIMEOUT)
     url = (
         f"{PRODUIT_SORTIE_URL}?"
@@ -90,49 +196,66 @@ def download_etat_prevendeur(driver, dated, datef, camion):
     )
     driver.get(url)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    excel_btn = driver.find_element(By.ID, 'j_idt545:j_idt604:j_idt610')
+    excel_btn = driver.find_element(By.ID, EXCEL_BUTTON_ID)
     excel_btn.click()
-    input("Press Enter after the download is complete...")
-    print("[✓] Excel download initiated.")
+
+    path = wait_for_download(download_dir, before, timeout)
+    if prevendeur:
+        target = os.path.join(download_dir, prevendeur + os.path.splitext(path)[1])
+        os.replace(path, target)
+        path = target
+    print(f"[✓] Excel downloaded: {path}")
+    return path
 
 
 # ---------- DOWNLOAD EXCEL FOR PREVENDEUR ----------
 def download_all_etats(driver, dated, datef):
-    camions = {
-        "VENTE": "",        # All
-        "WALID": "8442-0000005",
-        "MOHAMED": "8442-0000006",
-        "FETHI": "8442-0000007",
-        "MM": "8442-0000010"
-    }
-    for prev, camion in camions.items():
+    paths = {}
+    for prev, camion in CAMIONS.items():
         print('-' * 40)
         print(f"[+] Download Excel for {prev}.")
-        download_etat_prevendeur(driver, dated, datef, camion=camion)
-
+        paths[prev] = download_etat_prevendeur(driver, dated, datef, camion=camion, prevendeur=prev)
+    return paths
 
-def merge_excels_with_sheetnames(input_folder, output_file, sheet_names):
-    excel_files = sorted([
-        f for f in os.listdir(input_folder)
-        if f.endswith((".xlsx", ".xls"))
-    ])
 
-    if len(excel_files) != len(sheet_names):
-        raise ValueError(
-            f"Number of files ({len(excel_files)}) "
-            f"must match number of sheet names ({len(sheet_names)})"
-        )
-
-    with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
-        for file, sheet_name in zip(excel_files, sheet_names):
-            file_path = os.path.join(input_folder, file)
+def download_all_etats_parallel(username, password, dated, datef, workers=3,
+                                download_dir="./triz_downloads", headless=True, camions=None):
+    """
+    Export every camion concurrently with a small pool of drivers (one per thread).
+    Each driver downloads in its own folder, so a finished file is always attributed
+    to the right camion, then the file is moved to download_dir/<PREVENDEUR>.<ext>.
+    :return: {PREVENDEUR: path}
+    """
+    camions = camions or CAMIONS
+    download_dir = os.path.abspath(download_dir)
+    local = threading.local()
+    drivers = []
 
-            print(f"Adding {file} -> sheet: {sheet_name}")
+    def worker_driver():
+        if not hasattr(local, "driver"):
+            folder = os.path.join(download_dir, f".worker-{threading.get_ident()}")
+            local.driver = create_driver(headless=headless, download_dir=folder)
+            drivers.append(local.driver)
+            result = ensure_login(local.driver, username, password)
+            if not result["success"]:
+                raise RuntimeError(result["message"])
+        return local.driver
 
-            df = pd.read_excel(file_path)
-            df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+    def export(prev, camion):
+        print(f"[+] Download Excel for {prev}.")
+        path = download_etat_prevendeur(worker_driver(), dated, datef, camion=camion, prevendeur=prev)
+        target = os.path.join(download_dir, os.path.basename(path))
+        os.replace(path, target)
+        return prev, target
 
-    print("Done ✅", output_file)
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(camions))) as executor:
+            futures = [executor.submit(export, prev, camion) for prev, camion in camions.items()]
+            return dict(future.result() for future in futures)
+    finally:
+        for driver in drivers:
+            shutil.rmtree(driver.download_dir, ignore_errors=True)
+            driver.quit()
 
 
 if __name__ == '__main__':
@@ -142,7 +265,7 @@ if __name__ == '__main__':
     # passwd = os.getenv('triz_password')
 
     # driver = create_driver()
-    # result = login(driver, username, passwd)
+    # result = ensure_login(driver, username, passwd)      # login only if the saved session expired
     # if result["success"]:
     #    # # ------
     #    # print(result["message"])
@@ -154,5 +277,5 @@ if __name__ == '__main__':
 
     input_folder = "./triz_downloads"
     output_file = "VENTE_JANVIER_2026.xlsx"
-    sheet_names = ["WALID", "MOHAMED", "FETHI", "MM", "VENTE"]
+    sheet_names = ["VENTE", "WALID", "MOHAMED", "FETHI", "MM"]     # read_sales_files skips the first sheet
     merge_excels_with_sheetnames(input_folder, output_file, sheet_names)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : TrizStock server settings shared by triz_client (selenium) and triz_http (requests).
+#                 No import here: the browserless client must not load the browser stack.
+# ----------------------------------------------------------------------------
+BASE_URL = "http://51.255.79.241:8080/trizstock"
+LOGIN_URL = f"{BASE_URL}/faces/login.xhtml"
+DEFAULT_TIMEOUT = 20
+PRODUIT_SORTIE_URL = f"{BASE_URL}/faces/view/livraison/listDetailProduitSortieN.xhtml"
+EXCEL_BUTTON_ID = "j_idt545:j_idt604:j_idt610"      # Excel export button of PRODUIT_SORTIE_URL
+CAMIONS = {
+    "VENTE": "",        # All
+    "WALID": "8442-0000005",
+    "MOHAMED": "8442-0000006",
+    "FETHI": "8442-0000007",
+    "MM": "8442-0000010"
+}
+PREVENDEURS = [prev for prev, camion in CAMIONS.items() if camion]     # Without the "all camions" export
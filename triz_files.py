@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : TrizStock export files -> one workbook, without the browser stack
+#                 (used by triz_client and pipeline).
+# ----------------------------------------------------------------------------
+import os
+import pandas as pd
+import openpyxl
+
+
+# ---------- MERGE EXPORTS ----------
+def files_by_sheet(input_folder, sheet_names):
+    """
+    Map every sheet to its export file.
+    :sheet_names: list of sheet names, each one read from <input_folder>/<SHEET>.xlsx (or .xls),
+                  or a dict {sheet_name: file} (as returned by download_all_etats)
+    :return: {sheet_name: path}
+    """
+    if isinstance(sheet_names, dict):
+        mapping = {
+            sheet: file if os.path.isabs(file) else os.path.join(input_folder, file)
+            for sheet, file in sheet_names.items()
+        }
+    else:
+        exports = {
+            os.path.splitext(f)[0].upper(): os.path.abspath(os.path.join(input_folder, f))
+            for f in os.listdir(input_folder)
+            if f.endswith((".xlsx", ".xls"))
+        }
+        mapping = {sheet: exports.get(sheet.upper()) for sheet in sheet_names}
+
+    missing = [sheet for sheet, path in mapping.items() if not path or not os.path.exists(path)]
+    if missing:
+        raise ValueError(f"No export file for sheet(s): {', '.join(missing)}")
+    return mapping
+
+
+def _sheet_rows(file_path):
+    """ Rows of the first sheet of an export, values only, blank rows included. """
+    if file_path.endswith(".xls"):                      # openpyxl can't read the old format
+        df = pd.read_excel(file_path, header=None)
+        for row in df.itertuples(index=False):
+            yield tuple(None if pd.isna(value) else value for value in row)
+        return
+
+    source = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from source.worksheets[0].iter_rows(values_only=True)
+    finally:
+        source.close()
+
+
+def merge_excels_with_sheetnames(input_folder, output_file, sheet_names, stream=True):
+    """
+    Merge the exports into one workbook, one sheet per file.
+    :sheet_names: list of sheet names (files <SHEET>.xlsx in input_folder) or dict {sheet_name: file}
+    :stream: copy rows from source to target with read-only / write-only workbooks,
+             constant memory and the export layout (14 rows preamble) kept as is
+    """
+    files = files_by_sheet(input_folder, sheet_names)
+    root, ext = os.path.splitext(output_file)
+    tmp_file = f"{root}.tmp{ext}"                       # Never leave a half written workbook
+
+    if stream:
+        target = openpyxl.Workbook(write_only=True)
+        for sheet_name, file_path in files.items():
+            print(f"Adding {os.path.basename(file_path)} -> sheet: {sheet_name}")
+            ws = target.create_sheet(sheet_name[:31])
+            for row in _sheet_rows(file_path):
+                ws.append(row)
+        target.save(tmp_file)
+    else:
+        with pd.ExcelWriter(tmp_file, engine="openpyxl") as writer:
+            for sheet_name, file_path in files.items():
+                print(f"Adding {os.path.basename(file_path)} -> sheet: {sheet_name}")
+                df = pd.read_excel(file_path)
+                df.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+
+    os.replace(tmp_file, output_file)
+    print("Done ✅", output_file)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# desc          : TrizStock client without a browser (requests + JSF forms).
+#                 Same functions as triz_client, the "driver" is a pooled requests.Session.
+# ----------------------------------------------------------------------------
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from triz_config import BASE_URL, LOGIN_URL, PRODUIT_SORTIE_URL, DEFAULT_TIMEOUT, EXCEL_BUTTON_ID, CAMIONS
+
+
+# ---------- HTML FORMS ----------
+class _FormParser(HTMLParser):
+    """
+    Collect the forms of a JSF page (fields, buttons) and the login error messages.
+    A field is its attrs with the value the browser would post: checked checkbox / radio ("on" without value),
+    <select> = its selected (or first) option, <textarea> = its text.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.forms = []
+        self.errors = []
+        self._error_tag = None
+        self._select = None         # Open <select>: attrs + value of the chosen option
+        self._option = None         # Open <option>: {"value", "text", "selected"}
+        self._textarea = None       # Open <textarea>: attrs + text
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {key: value or "" for key, value in attrs}
+        if tag == "form":
+            self.forms.append({"attrs": attrs, "fields": [], "buttons": []})
+        elif tag == "select" and self.forms:
+            self._select = {**attrs, "value": None}
+        elif tag == "option" and self._select is not None:
+            self._end_option()                      # </option> is optional
+            self._option = {"value": attrs.get("value"), "text": "", "selected": "selected" in attrs}
+        elif tag == "textarea" and self.forms:
+            self._textarea = {**attrs, "value": ""}
+        elif tag in ("input", "button") and self.forms:
+            kind = attrs.get("type", "submit" if tag == "button" else "text").lower()
+            if kind in ("submit", "image") or tag == "button":
+                self.forms[-1]["buttons"].append(attrs)
+            elif kind not in ("checkbox", "radio"):
+                self.forms[-1]["fields"].append(attrs)
+            elif "checked" in attrs:
+                self.forms[-1]["fields"].append({"value": "on", **attrs})
+        if "ui-messages-error-summary" in attrs.get("class", "").split():
+            self._error_tag = tag
+            self.errors.append("")
+
+    def handle_endtag(self, tag):
+        if tag == self._error_tag:
+            self._error_tag = None
+        if tag == "option":
+            self._end_option()
+        elif tag == "select" and self._select is not None:
+            self._end_option()
+            if self._select["value"] is not None:   # A select without option is not posted
+                self.forms[-1]["fields"].append(self._select)
+            self._select = None
+        elif tag == "textarea" and self._textarea is not None:
+            self.forms[-1]["fields"].append(self._textarea)
+            self._textarea = None
+
+    def handle_data(self, data):
+        if self._error_tag:
+            self.errors[-1] += data.strip()
+        if self._option is not None:
+            self._option["text"] += data
+        elif self._textarea is not None:
+            self._textarea["value"] += data
+
+    def _end_option(self):
+        # The first option is the default, a selected one replaces it (the option text without value attr)
+        option, self._option = self._option, None
+        if option and (self._select["value"] is None or option["selected"]):
+            self._select["value"] = option["text"].strip() if option["value"] is None else option["value"]
+
+
+def _parse(html):
+    parser = _FormParser()
+    parser.feed(html)
+    return parser
+
+
+def _form_with(parser, element_id):
+    """
+    The form that contains the field / button element_id (id or name).
+    """
+    for form in parser.forms:
+        for attrs in form["fields"] + form["buttons"]:
+            if element_id in (attrs.get("id"), attrs.get("name")):
+                return form
+    return None
+
+
+def _form_data(form):
+    # Every named field with its current value (hidden fields carry the JSF ViewState)
+    return {attrs["name"]: attrs.get("value", "") for attrs in form["fields"] if attrs.get("name")}
+
+
+def _url(session, url):
+    # Same path on session.base_url (a local stand-in server in tests)
+    return session.base_url + url[len(BASE_URL):]
+
+
+# ---------- SESSION SETUP ----------
+def create_driver(download_dir="./triz_downloads", base_url=BASE_URL, pool_size=8, retries=3):
+    """
+    :return: requests.Session with a connection pool, used like the selenium driver
+    """
+    os.makedirs(download_dir, exist_ok=True)    # Create download dir if it doesn't exist
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (X11; Linux x86_64) livraison-dashboard"
+    session.base_url = base_url.rstrip("/")
+    session.download_dir = os.path.abspath(download_dir)
+    return session
+
+
+# ---------- LOGIN ----------
+def login(session, username: str, password: str, timeout: int = DEFAULT_TIMEOUT) -> bool:
+    print("[+] Login...")
+
+    url = _url(session, LOGIN_URL)
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+
+    form = _form_with(_parse(response.text), "j_username")
+    if form is None:
+        return {"success": False, "message": "[✗] Login failed: formulaire de connexion introuvable."}
+
+    data = _form_data(form)
+    data["j_username"] = username
+    data["j_password"] = password
+    # Enter in the password field submits the form with its first button
+    button = next((attrs for attrs in form["buttons"] if attrs.get("name")), None)
+    if button:
+        data[button["name"]] = button.get("value", "")
+
+    action = urljoin(response.url, form["attrs"].get("action", ""))
+    response = session.post(action, data=data, timeout=timeout)
+    response.raise_for_status()
+
+    page = _parse(response.text)
+    if page.errors:
+        return {"success": False, "message": f"[✗] Login failed: {page.errors[0]}"}
+    if _form_with(page, "j_password") is not None:
+        return {"success": False, "message": "[✗] Login failed."}       # Login page again
+    return {"success": True, "message": "[✓] Login successful."}
+
+
+# ---------- DOWNLOAD EXCEL FILE ----------
+def _attachment_name(response):
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)|filename=\"?([^\";]+)\"?", disposition, re.IGNORECASE)
+    if not match:
+        return None
+    return os.path.basename(unquote(match.group(1) or match.group(2)).strip())
+
+
+def download_etat_prevendeur(session, dated, datef, camion, filename=None, timeout=DEFAULT_TIMEOUT):
+    """
+    This function will download the Excel File
+    :filename: saved as download_dir/filename (extension of the server file if omitted),
+               default = name sent by the server
+    :return: path of the saved file
+    """
+    url = _url(session, PRODUIT_SORTIE_URL)
+    params = {"datef": datef, "dated": dated, "statut": "livrer"}
+    if camion:
+        params = {"camion": camion, **params}
+    response = session.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+
+    form = _form_with(_parse(response.text), EXCEL_BUTTON_ID)
+    if form is None:
+        raise RuntimeError("[✗] Bouton d'export Excel introuvable (session expirée ?)")
+
+    data = _form_data(form)
+    data[EXCEL_BUTTON_ID] = EXCEL_BUTTON_ID         # Non-ajax JSF button: its id posted with the form
+
+    action = urljoin(response.url, form["attrs"].get("action", ""))
+    response = session.post(action, data=data, timeout=timeout, stream=True)
+    response.raise_for_status()
+    if "html" in response.headers.get("Content-Type", ""):
+        raise RuntimeError("[✗] Le serveur a renvoyé une page au lieu du fichier Excel.")
+
+    name = _attachment_name(response) or f"{camion or 'VENTE'}.xlsx"
+    if filename:                                    # Keep the server extension when filename has none
+        name = filename if os.path.splitext(filename)[1] else filename + (os.path.splitext(name)[1] or ".xlsx")
+    path = os.path.join(session.download_dir, name)
+    tmp_path = f"{path}.part"
+    with open(tmp_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    print(f"[✓] Excel downloaded: {path}")
+    return path
+
+
+# ---------- DOWNLOAD EXCEL FOR PREVENDEUR ----------
+def download_all_etats(session, dated, datef):
+    paths = {}
+    for prev, camion in CAMIONS.items():
+        print('-' * 40)
+        print(f"[+] Download Excel for {prev}.")
+        paths[prev] = download_etat_prevendeur(session, dated, datef, camion=camion, filename=prev)
+    return paths
+
+
+if __name__ == '__main__':
+    import dotenv
+    dotenv.load_dotenv(dotenv.find_dotenv())
+    username = os.getenv("triz_username")
+    passwd = os.getenv('triz_password')
+
+    session = create_driver()
+    result = login(session, username, passwd)
+    print(result["message"])
+    if result["success"]:
+        download_all_etats(session, "01-01-2026", "31-01-2026")
@@ -2,8 +2,23 @@
 # -*- coding: utf-8 -*-
 #
 # ----------------------------------------------------------------------------
+import io
 import re
 import os
+import json
+import shutil
+import hashlib
+import warnings
+import weakref
+import unicodedata
+import itertools
+import threading
+import functools
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
 import pandas as pd
 import plotly.express as px
 
@@ -21,17 +36,644 @@ mois_order = {
     "SEPTEMBRE": 9, "OCTOBRE": 10,
     "NOVEMBRE": 11, "DECEMBRE": 12,
 }
+MONTH_BY_NUM = {num: name for name, num in MONTHS_NAMES.items()}     # Canonical spelling (store partitions)
 
 FAMILLE_FIELDS = ["Quantité", "Total livraison (DA)", "Total bénéfice (DA)"]            # Fields
+PRODUCT_CUBE_KEYS = ["YEAR", "MOIS", "MOIS_NUM", "PREVENDEUR", "Famille", "Sous famille", "Produit"]   # Grain of build_product_cube
+# Columns kept from the TrizStock export sheets (the 2nd "Quantité" is the delivered one)
+SALES_ENGINES = ("openpyxl", "stream", "calamine")     # See read_sales_files
+SALES_COLUMNS = ["Famille", "Sous famille", "Produit", "Quantité.1", "Total livraison (DA)", "Total bénéfice (DA)"]
+
+# --- LIVRAISON sheets ---
+DATE_FORMAT = "%d/%m/%Y"        # Dates typed as text in the sheet (real Excel dates need no format)
+NUMERIC_COLUMNS = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
+ROLLUP_KEYS = ["YEAR", "MOIS", "MOIS_NUM", "DATE", "LIVREUR"]       # Grain of build_livraison_rollup
+
+# --- Compact dtypes applied at load time (see apply_schema) ---
+LIVRAISON_CATEGORIES = ["LIVREUR"]
+VENTE_CATEGORIES = ["PREVENDEUR", "Famille", "Sous famille", "Produit"]
+INTEGER_COLUMNS = ["YEAR", "MOIS_NUM", "Quantité"]      # Downcast to the smallest int when the values allow it
+AMOUNT_COLUMNS = [                          # int64 / float64: row-wise arithmetic must not wrap around
+    "T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF",
+    "Total livraison (DA)", "Total bénéfice (DA)",
+]
+
+# --- Parquet cache of cleaned frames (survives server restarts) ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "frames"))   # Env: seen by worker processes
+CACHE_VERSION = 5       # Bump when the cleaning rules change, old entries are then ignored
+
+# --- Persistent store: one Parquet file per partition, upserted month by month ---
+STORE_DIR = os.environ.get("DASHBOARD_STORE_DIR", os.path.join(BASE_DIR, "store"))
+STORE_KEYS = {
+    "livraison": ["YEAR", "MOIS"],
+    "vente": ["YEAR", "MOIS", "PREVENDEUR"],
+}
+
+# --- Pie charts: slices beyond the top N are folded in one "Autres" slice ---
+PIE_TOP_N = 12
+PIE_OTHERS = "Autres"
+
+# --- Memoized derived tables (shared by all the sessions of the server) ---
+MEMO_SIZE = 128         # Results kept per function, least recently used dropped first
+
+
+# ------------------------------------------------------
+# --- CACHE ---
+# -------------
+def file_digest(file):
+    """
+    Content hash (sha256) of an uploaded file or a path on disk.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+
+def _cache_path(digest, sheet, kind, params):
+    key = f"{CACHE_VERSION}:{kind}:{digest}:{sheet}:{sorted(params.items())}"
+    return os.path.join(CACHE_DIR, kind, hashlib.sha256(key.encode()).hexdigest() + ".parquet")
+
+
+def _tmp_path(path):
+    # Unique per process and thread: concurrent writers never share a tmp file
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def load_cached_frame(digest, sheet, kind, **params):
+    """
+    Return the cleaned frame of (file digest, sheet) from the Parquet cache, None on a miss.
+    :kind: "livraison" or "vente", keeps both readers apart
+    :params: reader options that change the result (e.g. nrows)
+    """
+    path = _cache_path(digest, sheet, kind, params)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError):
+        return None             # Broken entry, the caller rebuilds it
+
+
+def store_cached_frame(df, digest, sheet, kind, **params):
+    """
+    Write a cleaned frame to the Parquet cache (see load_cached_frame).
+    """
+    path = _cache_path(digest, sheet, kind, params)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = _tmp_path(path)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)      # Atomic, readers never see a partial file
+    except (OSError, ValueError, TypeError):
+        pass                    # Frame not storable (mixed types...), just skip the cache
+
+
+# ------------------------------------------------------
+# --- SCHEMA ---
+# --------------
+def month_dtype(months):
+    """
+    Ordered categorical of the given months, in calendar order (unknown names last).
+    """
+    months = sorted(set(months), key=lambda month: (mois_order.get(month, 13), month))
+    return pd.CategoricalDtype(months, ordered=True)
+
+
+def apply_schema(df, categories):
+    """
+    Compact dtypes for a loaded frame:
+    - dimension columns as categories (cheap groupby / filter)
+    - MOIS as an ordered categorical, MOIS_NUM / YEAR as small ints
+    - amounts as int64 when they are whole numbers, float64 otherwise (exact DA totals, no overflow)
+    Apply it on the final frame: concatenating frames with different categories gives objects back.
+    """
+    columns = {col: df[col].astype("category") for col in categories if col in df.columns}
+    if "MOIS" in df.columns:
+        columns["MOIS"] = df["MOIS"].astype(month_dtype(df["MOIS"].dropna()))
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            columns[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in AMOUNT_COLUMNS:
+        if col in df.columns:
+            amount = pd.to_numeric(df[col])
+            # Float column of whole numbers (a reader that saw the NaN footer): int64 like the others
+            whole = pd.api.types.is_integer_dtype(amount) or (amount.notna().all() and amount.mod(1).eq(0).all())
+            columns[col] = amount.astype("int64") if whole else amount
+    return df.assign(**columns)
+
+
+# ------------------------------------------------------
+# --- MEMO ---
+# ------------
+_fingerprints = {}          # id(frame) -> (weakref to the frame, fingerprint)
+
+
+def _remember(obj, fingerprint):
+    key = id(obj)
+    _fingerprints[key] = (weakref.ref(obj, lambda _: _fingerprints.pop(key, None)), fingerprint)
+
+
+def frame_fingerprint(obj):
+    """
+    Content hash of a DataFrame / Series / Index, computed once per object
+    (frames returned by a memoized function get the hash of their call for free).
+    """
+    entry = _fingerprints.get(id(obj))
+    if entry and entry[0]() is obj:
+        return entry[1]
+
+    frame = obj if isinstance(obj, pd.DataFrame) else obj.to_frame()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((type(obj).__name__, frame.shape, list(frame.columns), [str(t) for t in frame.dtypes])).encode())
+    digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    _remember(obj, fingerprint)
+    return fingerprint
+
+
+def _memo_key(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return ("frame", frame_fingerprint(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_memo_key(item) for item in value)
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((key, _memo_key(item)) for key, item in value.items())))
+    return value
+
+
+def memoize(maxsize=MEMO_SIZE):
+    """
+    Cache the results of a function of frames, keyed on the fingerprint of the frames
+    and the other arguments, with LRU eviction.
+    The results are shared: never modify them in place.
+    """
+    def decorator(func):
+        cache = collections.OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (_memo_key(args), tuple(sorted((name, _memo_key(value)) for name, value in kwargs.items())))
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+
+            result = func(*args, **kwargs)
+            fingerprint = hashlib.blake2b(repr((func.__qualname__, key)).encode(), digest_size=16).hexdigest()
+            for i, item in enumerate(result if isinstance(result, tuple) else (result,)):
+                if isinstance(item, (pd.DataFrame, pd.Series, pd.Index)):
+                    _remember(item, f"{fingerprint}:{i}")
+            with lock:
+                cache[key] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@memoize()
+def select_rows(df, column, value):
+    """
+    Rows of df where column == value (memoized: the same frame is returned for the same selection).
+    """
+    return df[df[column] == value]
+
+
+# ------------------------------------------------------
+# --- SEARCH ---
+# --------------
+def normalize_text(text):
+    """
+    Casefolded text without accents: "Crème Glacée" -> "creme glacee".
+    """
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+class SearchIndex:
+    """
+    Accent / case insensitive "contains" search on a text column.
+    The distinct values are indexed once by their 1, 2 and 3-grams, a query then only
+    intersects small posting sets instead of scanning every row.
+    Every word of a multi-word query must match.
+    """
+
+    def __init__(self, values):
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        self._codes = codes                                 # Row -> value id (-1 for NaN)
+        self.values = list(uniques)
+        self._names = [normalize_text(value) for value in uniques]
+
+        self._grams = collections.defaultdict(set)          # "cre" -> {value ids}
+        for value_id, name in enumerate(self._names):
+            for size in (1, 2, 3):
+                for i in range(len(name) - size + 1):
+                    self._grams[name[i:i + size]].add(value_id)
+
+    def _match(self, token):
+        if len(token) <= 3:
+            return set(self._grams.get(token, ()))
+        # Longer words: values holding all their trigrams, then checked on the full word
+        ids = set.intersection(*(self._grams.get(token[i:i + 3], set()) for i in range(len(token) - 2)))
+        return {value_id for value_id in ids if token in self._names[value_id]}
+
+    def value_ids(self, query):
+        tokens = normalize_text(query).split()
+        if not tokens:
+            return set(range(len(self.values)))
+        ids = self._match(tokens[0])
+        for token in tokens[1:]:
+            if not ids:
+                break
+            ids &= self._match(token)
+        return ids
+
+    def matches(self, query):
+        """
+        Distinct values matching the query (e.g. the Famille / Sous famille names).
+        """
+        return [self.values[value_id] for value_id in sorted(self.value_ids(query))]
+
+    def search(self, query):
+        """
+        Positions of the matching rows, for df.iloc[positions].
+        """
+        ids = np.fromiter(self.value_ids(query), dtype=self._codes.dtype)
+        return np.flatnonzero(np.isin(self._codes, ids))
+
+
+@memoize()
+def search_index(df, column):
+    """
+    SearchIndex of df[column], built once per dataset.
+    """
+    return SearchIndex(df[column])
+
+
+@memoize()
+def filter_rows(df, column, query):
+    """
+    Rows of df whose column matches the query (see SearchIndex).
+    """
+    return df.iloc[search_index(df, column).search(query)]
+
+
+@memoize()
+def sort_rows(df, column, ascending=True):
+    return df.sort_values(column, ascending=ascending, kind="stable")
+
+
+# ------------------------------------------------------
+# --- WORKBOOK ---
+# ---------------
+class Workbook:
+    """
+    One uploaded Excel file, opened once and shared by every reader.
+    The sheet list and the cleaned sheets are cached by content hash, so a known
+    file is never opened again; otherwise all the missing sheets are parsed in one pass.
+    """
+
+    def __init__(self, file, engine=None):
+        self.file = file
+        self.name = os.path.basename(file if isinstance(file, (str, os.PathLike)) else file.name)
+        self.engine = engine
+        self.digest = file_digest(file)
+        self._xls = None
+        self._sheet_names = None
+
+    @property
+    def xls(self):
+        if self._xls is None:
+            self._xls = pd.ExcelFile(self.file, engine=self.engine)
+        return self._xls
+
+    @property
+    def sheet_names(self):
+        if self._sheet_names is None:
+            path = os.path.join(CACHE_DIR, "sheets", f"{self.digest}.json")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._sheet_names = json.load(f)
+            except (OSError, ValueError):
+                self._sheet_names = self.xls.sheet_names
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(self._sheet_names, f, ensure_ascii=False)
+                except OSError:
+                    pass
+        return self._sheet_names
+
+    def read(self, sheets, **kwargs):
+        """
+        Parse several sheets in a single call on the opened file -> {sheet: df}
+        """
+        sheets = list(sheets)
+        if not sheets:
+            return {}
+        return pd.read_excel(self.xls, sheet_name=sheets, **kwargs)
+
+    def rows(self, sheet):
+        """
+        Iterate the cell values of a sheet row by row, without building a DataFrame.
+        """
+        if self.xls.engine == "calamine":
+            return iter(self.xls.book.get_sheet_by_name(sheet).to_python(skip_empty_area=False))
+        return self.xls.book[sheet].iter_rows(values_only=True)     # openpyxl read-only
+
+    def frames(self, sheets, kind, clean, reader=None, key=None, **kwargs):
+        """
+        Cleaned frames of several sheets -> {sheet: df}, in the order of sheets.
+        :clean: function(raw_df) -> df, raises ValueError on an invalid sheet
+        :reader: function(sheets) -> {sheet: raw_df}, replaces self.read for the missing sheets
+        :key: extra cache key entries, e.g. the reader used (not passed to pd.read_excel)
+        :kwargs: passed to pd.read_excel, also part of the cache key
+        """
+        params = {**kwargs, **(key or {})}
+        frames = {}
+        for sheet in sheets:
+            df = load_cached_frame(self.digest, sheet, kind, **params)
+            if df is not None:
+                frames[sheet] = df
+
+        missing = [sheet for sheet in sheets if sheet not in frames]
+        raw_frames = reader(missing) if reader else self.read(missing, **kwargs)
+        for sheet, raw in raw_frames.items():
+            df = clean(raw)
+            store_cached_frame(df, self.digest, sheet, kind, **params)
+            frames[sheet] = df
+        return {sheet: frames[sheet] for sheet in sheets}
+
+    def __getstate__(self):
+        # Sent to worker processes: keep the content, the ExcelFile is opened again there
+        state = self.__dict__.copy()
+        state["_xls"] = None
+        if not isinstance(self.file, (str, os.PathLike)):
+            state["file"] = io.BytesIO(self.file.getvalue())
+        return state
+
+    def close(self):
+        if self._xls is not None:
+            self._xls.close()
+            self._xls = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def process_context(preload=()):
+    """
+    Start method of the process pools.
+    forkserver: children come from a clean process with the preload modules already imported.
+    Not available on Windows, the platform default (spawn) is used there.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(list(preload))
+    return context
+
+
+def map_files(func, files, workers=1, *args):
+    """
+    Return [func(file, *args) for file in files], in the order of files.
+    With several files and workers != 1 the files are parsed in a process pool
+    (each file is still read in one pass by its own worker).
+    :workers: number of processes, None = os.cpu_count()
+    """
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    if workers <= 1:
+        return [func(file, *args) for file in files]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_context([__name__])) as executor:
+        return list(executor.map(func, files, *(itertools.repeat(arg, len(files)) for arg in args)))
+
+
+def open_workbook(file, engine=None):
+    """
+    Accept an uploaded file, a path or an already opened Workbook.
+    :engine: pandas Excel engine, an opened Workbook is switched to it if needed
+    """
+    if not isinstance(file, Workbook):
+        return Workbook(file, engine)
+    if engine and (file.engine or "openpyxl") != engine:
+        file.close()
+        file.engine = engine
+    return file
+
+
+# ------------------------------------------------------
+# --- STORE ---
+# -------------
+def canonical_month(mois):
+    """
+    One spelling per month (FÉVRIER -> FEVRIER, AOÛT -> AOUT), as in MONTHS_NAMES.
+    """
+    num = mois_order.get(str(mois).upper())
+    return MONTH_BY_NUM[num] if num else mois
+
+
+def _partition_dir(kind, partition):
+    parts = [f"{key}={str(partition[key]).replace(os.sep, '_')}" for key in STORE_KEYS[kind]]
+    return os.path.join(STORE_DIR, kind, *parts)
+
+
+def store_upsert(df, kind, partition, source=None):
+    """
+    Write df as the (YEAR, MOIS[, PREVENDEUR]) partition of the store, replacing the old one.
+    :partition: {"YEAR": 2024, "MOIS": "JANVIER", ...} (STORE_KEYS[kind])
+    :source: digest of the data source, the write is skipped when the partition already has it
+             (stored with CACHE_VERSION: a change of the cleaning rules rewrites every partition)
+    Return True when the partition was written (False if skipped or not storable).
+    """
+    partition = {**partition, "MOIS": canonical_month(partition["MOIS"])}
+    folder = _partition_dir(kind, partition)
+    source_path = os.path.join(folder, "SOURCE")
+    if source is not None:
+        source = f"{CACHE_VERSION}:{source}"
+        try:
+            with open(source_path, encoding="utf-8") as f:
+                if f.read() == source:
+                    return False            # Same file already stored
+        except OSError:
+            pass
+
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, "part.parquet")
+    tmp_path = _tmp_path(path)
+    try:
+        df.assign(**partition).to_parquet(tmp_path, index=False)
+    except (ValueError, TypeError):
+        # Frame not storable (mixed types...): the caller still has the data, only the store misses it
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    with open(source_path, "w", encoding="utf-8") as f:
+        f.write(source or "")
+
+    # Same month stored under another spelling (FÉVRIER before FEVRIER): replaced by this one
+    for alias, num in mois_order.items():
+        if num == mois_order.get(partition["MOIS"]) and alias != partition["MOIS"]:
+            shutil.rmtree(_partition_dir(kind, {**partition, "MOIS": alias}), ignore_errors=True)
+    return True
+
+
+def _store_files(kind):
+    folder = os.path.join(STORE_DIR, kind)
+    paths = []
+    for root, _, files in os.walk(folder):
+        if "part.parquet" in files:
+            paths.append(os.path.join(root, "part.parquet"))
+    return sorted(paths)
+
+
+def _path_partition(kind, path):
+    folder = os.path.relpath(os.path.dirname(path), os.path.join(STORE_DIR, kind))
+    return dict(part.split("=", 1) for part in folder.split(os.sep))
+
+
+def store_partitions(kind):
+    """
+    Partitions present in the store -> DataFrame with the STORE_KEYS[kind] columns.
+    """
+    rows = [_path_partition(kind, path) for path in _store_files(kind)]
+    return pd.DataFrame(rows, columns=STORE_KEYS[kind])
+
+
+def store_version(kind):
+    """
+    Changes whenever a partition is written (use it in cache keys).
+    """
+    return max((os.path.getmtime(path) for path in _store_files(kind)), default=0)
+
+
+def load_store(kind, months=None):
+    """
+    Read the stored partitions (optionally only some months) into one DataFrame.
+    None when the store has nothing for them.
+    """
+    if months is not None:
+        months = {canonical_month(month) for month in months}
+    dfs = []
+    for path in _store_files(kind):
+        if months is not None and _path_partition(kind, path)["MOIS"] not in months:
+            continue
+        dfs.append(pd.read_parquet(path))
+    if not dfs:
+        return None
+    categories = LIVRAISON_CATEGORIES if kind == "livraison" else VENTE_CATEGORIES
+    df = pd.concat(dfs, ignore_index=True)
+    df = df.assign(MOIS_NUM=df["MOIS"].map(mois_order))
+    return (
+        df.sort_values(STORE_KEYS[kind][:1] + ["MOIS_NUM"] + STORE_KEYS[kind][2:], kind="stable", ignore_index=True)
+        .pipe(apply_schema, categories)
+    )
+
+
+# ------------------------------------------------------
+# --- DELTAS ---
+# --------------
+def add_deltas(df, measures, by=None, period="month", fill=0):
+    """
+    Sort df on (YEAR, MOIS_NUM) and add for every measure:
+    delta_<measure> and delta_<measure>_pct against the previous month of the same group (period="month"),
+    or yoy_<measure> and yoy_<measure>_pct against the same month of the previous year (period="year").
+    :by: group columns (e.g. ["PREVENDEUR"]), None = whole frame
+    :fill: value for the rows without a previous period, None keeps NaN
+    """
+    by = list(by or [])
+    df = df.sort_values(["YEAR", "MOIS_NUM"], kind="stable")
+
+    if period == "month":
+        prefix = "delta"
+        # One grouped shift for every measure
+        previous = df.groupby(by, observed=True, sort=False)[measures].shift(1) if by else df[measures].shift(1)
+    elif period == "year":
+        prefix = "yoy"
+        keys = by + ["YEAR", "MOIS_NUM"]
+        last_year = df[keys + measures].assign(YEAR=lambda x: x["YEAR"].astype(int) + 1)
+        previous = (
+            df[keys].assign(YEAR=lambda x: x["YEAR"].astype(int))
+            .merge(last_year, on=keys, how="left")[measures]
+            .set_axis(df.index)
+        )
+    else:
+        raise ValueError(f"Période inconnue: {period}")
+
+    diff = df[measures] - previous
+    pct = diff / previous * 100
+    columns = {f"{prefix}_{col}": diff[col] for col in measures}
+    columns.update({f"{prefix}_{col}_pct": pct[col] for col in measures})
+    deltas = pd.DataFrame(columns, index=df.index)
+    if fill is not None:
+        deltas = deltas.fillna(fill)
+    return pd.concat([df, deltas], axis=1)
+
+
+# ------------------------------------------------------
+# --- CHARTS ---
+# --------------
+def pie_data(df, names, values, top=PIE_TOP_N, others=PIE_OTHERS):
+    """
+    One row per slice: values summed by names (first appearance order, like plotly colors),
+    the slices after the top biggest summed in a last `others` row. top=None keeps every slice.
+    """
+    data = (
+        df.groupby(names, as_index=False, observed=True, sort=False)[values]
+        .sum()
+        .astype({names: object})
+    )
+    if top is None or len(data) <= top:
+        return data
+    kept = data[values].nlargest(top, keep="first").index
+    tail = data.drop(kept)
+    return pd.concat(
+        [data.loc[data.index.isin(kept)], pd.DataFrame({names: [others], values: [tail[values].sum()]})],
+        ignore_index=True,
+    )
+
+
+@memoize()
+def pie_chart(df, names, values, top=PIE_TOP_N, **kwargs):
+    """
+    px.pie on pie_data: the figure only carries one point per slice (memoized like figure).
+    """
+    kwargs.setdefault("template", "plotly_white")
+    return px.pie(pie_data(df, names, values, top), names=names, values=values, **kwargs)
+
+
+@memoize()
+def figure(kind, df, layout=None, **kwargs):
+    """
+    Plotly Express figure px.<kind>(df, **kwargs) with fig.update_layout(**layout),
+    built once per (data fingerprint, parameters): an unchanged chart costs nothing on rerun.
+    The figure is shared: don't update it after the call, pass layout instead.
+    """
+    fig = getattr(px, kind)(df, **kwargs)
+    if layout:
+        fig.update_layout(**layout)
+    return fig
 
 
 # ------------------------------------------------------
 # --- LIVRAISON PAGE ---
 # ---------------------
-def read_livraison_multi_year(files, selected_months):
+def read_livraison_multi_year(files, selected_months, workers=1, store=True):
     """
     Load multiple Excel files (years) and multiple months into one DataFrame.
     Filename must contain YEAR (e.g. LIVRAISON_2024.xlsx)
+    :workers: processes used to parse the files (None = all CPUs, 1 = serial)
+    :store: also upsert every loaded month in the persistent store
     """
 
     if not selected_months:
@@ -40,47 +682,81 @@ def read_livraison_multi_year(files, selected_months):
     if not isinstance(files, (list, tuple)):
         files = [files]
 
-    dfs = []
-
     try:
-        for file in files:
-            # --- Extract YEAR from filename ---
-            filename = os.path.basename(file.name)
-            match = re.search(r"(\d{4})", filename)
-
-            if not match:
-                raise ValueError(f"Année introuvable dans le fichier: {filename}")
-
-            year = int(match.group(1))
-
-            # --- Read selected months ---
-            for month in selected_months:
-                if month not in pd.ExcelFile(file, None).sheet_names:
-                    continue
-                result = clean_dataframe(
-                    pd.read_excel(file, sheet_name=month, usecols="A:H")
-                )
-
-                if not result["success"]:
-                    return {"success": False, "message": result["message"]}
-
-                df = (
-                    result["df"].copy()
-                    .assign(
-                        YEAR=year,
-                        MOIS=month,
-                        MOIS_NUM=lambda x: x["MOIS"].map(mois_order),
-                    )
-                )
-                dfs.append(df)
-
-        final_df = pd.concat(dfs, ignore_index=True).sort_values(["YEAR", "MOIS_NUM"])
+        dfs = itertools.chain.from_iterable(
+            map_files(_read_livraison_file, files, workers, selected_months, store)
+        )
+        final_df = pd.concat(dfs, ignore_index=True).sort_values(["YEAR", "MOIS_NUM"], kind="stable")
+        final_df = apply_schema(final_df, LIVRAISON_CATEGORIES)
         # .drop(columns="MOIS_NUM")
 
         return {"success": True, "data": final_df}
 
+    except (ValueError, BrokenProcessPool) as err:
+        return {"success": False, "message": str(err)}
+
+
+def _read_livraison_file(file, selected_months, store=False):
+    workbook = open_workbook(file)
+
+    # --- Extract YEAR from filename ---
+    filename = workbook.name
+    match = re.search(r"(\d{4})", filename)
+
+    if not match:
+        raise ValueError(f"Année introuvable dans le fichier: {filename}")
+
+    year = int(match.group(1))
+
+    # --- Read selected months (one parse for all of them) ---
+    dfs = []
+    months = [month for month in selected_months if month in workbook.sheet_names]
+    for month, df in workbook.frames(months, "livraison", _clean_livraison, usecols="A:H").items():
+        if store:
+            store_upsert(df, "livraison", {"YEAR": year, "MOIS": month}, source=f"{workbook.digest}:{month}")
+        df = (
+            df.assign(
+                YEAR=year,
+                MOIS=month,
+                MOIS_NUM=lambda x: x["MOIS"].map(mois_order),
+            )
+        )
+        dfs.append(df)
+    return dfs
+
+
+def read_livraison_store(selected_months):
+    """
+    Same result as read_livraison_multi_year, from the persistent store (no Excel parsing).
+    """
+    if not selected_months:
+        return {"success": False, "message": "Aucun mois sélectionné."}
+    df = load_store("livraison", selected_months)
+    if df is None:
+        return {"success": False, "message": "Aucune donnée enregistrée pour ces mois."}
+    return {"success": True, "data": df}
+
+
+def read_livraison_sheet(excel_file, sheet_name, nrows=None):
+    """
+    Load and clean one month sheet of a LIVRAISON file (cached on disk).
+    """
+    workbook = open_workbook(excel_file)
+    try:
+        df = workbook.frames([sheet_name], "livraison", _clean_livraison, usecols="A:H", nrows=nrows)[sheet_name]
+        df = apply_schema(df, LIVRAISON_CATEGORIES)
     except ValueError as err:
         return {"success": False, "message": str(err)}
+    if df.attrs.get("warning"):
+        return {"success": True, "df": df, "warning": df.attrs["warning"]}
+    return {"success": True, "df": df}
+
+
+def _clean_livraison(df):
+    result = clean_dataframe(df)
+    if not result["success"]:
+        raise ValueError(result["message"])
+    return result["df"]
 
 
 def read_livraison_files(excel_file, selected_months):
@@ -88,8 +764,9 @@ def read_livraison_files(excel_file, selected_months):
     This function load multipla months in one df
     """
     dfs = []
+    raw = open_workbook(excel_file).read(selected_months, usecols="A:H")
     for month in selected_months:
-        data = clean_dataframe(pd.read_excel(excel_file, sheet_name=month, usecols="A:H"))
+        data = clean_dataframe(raw[month])
         if data["success"]:
             df = data["df"]
             df["MOIS"] = month
@@ -109,60 +786,116 @@ def read_livraison_files(excel_file, selected_months):
 
 
 def clean_dataframe(df):
-    try:
-        df["DATE"] = pd.to_datetime(df["DATE"], errors="coerce").dt.date
-    except KeyError:
+    """
+    Clean a raw LIVRAISON sheet in one pass and return a new frame (the raw one is untouched):
+    - DATE parsed with DATE_FORMAT (Excel dates are already datetimes), the other texts (ISO, with a time...)
+      parsed again day first; rows without DATE (blank, TOTAL labels) dropped, a text with digits that is not a date
+      (e.g. "TOTAL 2025") dropped too and reported in "warning" (kept in df.attrs, it survives the disk cache)
+    - amounts coerced to numbers in one block, missing ones = 0
+    - missing OBSERVATION / text = "", texts as str (a numeric LIVREUR cell too)
+    """
+    if "DATE" not in df.columns:
         return {"success": False, "message": "La colonne 'DATE' est manquante dans le fichier Excel."}
 
-    numeric_columns = ["T. COMMANDE", "T.LOGICIEL", "VERSEMENT", "CHARGE", "DIFF"]
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    dates = pd.to_datetime(df["DATE"], format=DATE_FORMAT, errors="coerce")
+    warning = None
+    retry = dates.isna() & df["DATE"].notna()      # Only the few cells the fixed format missed
+    if retry.any():
+        texts = df.loc[retry, "DATE"].astype(str).str.strip()
+        dates[retry] = pd.to_datetime(texts, format="mixed", dayfirst=True, errors="coerce")
+        invalid = texts[dates[retry].isna() & texts.str.contains(r"\d")]
+        if len(invalid):
+            cells = ", ".join(f"ligne {row + 2}: {text!r}" for row, text in invalid.head(5).items())
+            warning = f"{len(invalid)} ligne(s) ignorée(s), DATE invalide ({cells})."
+            warnings.warn(warning, stacklevel=2)
+    valid = dates.notna()       # Remove rows without a valid DATE (e.g. subtotal / footer rows)
+    rows = df[valid]
 
-    df = df[df["DATE"].notna()]     # Remove rows without a valid DATE (e.g. subtotal / footer rows)
-    df["OBSERVATION"] = df["OBSERVATION"].astype(str).replace("nan", "")
-    df = df.fillna(0)
-    return {"success": True, "df": df}
+    numeric = [col for col in NUMERIC_COLUMNS if col in df.columns]
+    numbers = rows[numeric].apply(pd.to_numeric, errors="coerce").fillna(0)
 
+    columns = {}
+    for col in df.columns:
+        if col == "DATE":
+            columns[col] = dates[valid].dt.date
+        elif col in numbers:
+            columns[col] = numbers[col]
+        elif col == "OBSERVATION":
+            columns[col] = rows[col].where(rows[col].notna(), "").astype(str)
+        else:
+            columns[col] = rows[col].fillna("").astype(str)
+    clean_df = pd.DataFrame(columns)
+    if warning:
+        clean_df.attrs["warning"] = warning
+        return {"success": True, "df": clean_df, "warning": warning}
+    return {"success": True, "df": clean_df}
 
-def etat_excel_like_db(clean_df):
+
+def build_livraison_rollup(clean_df):
     """
-    this function return
-    ["ACCOMTE", "CREDIT", "VERSEMENT CREDIT", "CHARGE"] to display in QLabel Excel Etat
+    Daily totals per LIVREUR, built once at load time: amounts, RETOUR and OBSERVATION texts
+    summed at (YEAR, MOIS, DATE, LIVREUR) grain. Every livraison KPI below answers from it,
+    so a rerun only works on the groups, not on the raw rows (raw rows are accepted too).
     """
-    versement = clean_df.groupby(["DATE"])[["VERSEMENT"]].sum()
-    total_command = clean_df.groupby(["DATE"])[["T.LOGICIEL"]].sum()
-    charges = clean_df.groupby(["DATE"])[["CHARGE"]].sum()
+    keys = [key for key in ROLLUP_KEYS if key in clean_df.columns]
+    fields = [field for field in NUMERIC_COLUMNS + ["OBSERVATION"] if field in clean_df.columns]
+    return (
+        clean_df[keys + fields]
+        .assign(RETOUR=clean_df["T. COMMANDE"] - clean_df["T.LOGICIEL"])
+        .groupby(keys, as_index=False, observed=True, dropna=False)
+        .sum()
+    )
+
+
+def _as_rollup(df):
+    return df if "RETOUR" in df.columns else build_livraison_rollup(df)
 
-    # --- Sum VERSEMENT by LIVREUR ---
-    vers_by_livreur = clean_df.groupby("LIVREUR", as_index=False)["VERSEMENT"].sum()
-    livreur = vers_by_livreur[vers_by_livreur["LIVREUR"].isin(["ACCOMPTE", "CREDIT", "VERS. CREDIT"])]
-    livreur = livreur.set_index("LIVREUR")
 
-    retour = clean_df.copy()
-    retour["RETOUR"] = retour["T. COMMANDE"] - retour["T.LOGICIEL"]
-    total_retour = retour.groupby("LIVREUR", as_index=False)["RETOUR"].sum()
+def etat_mensuel(clean_df):
+    """
+    Every Etat Mensuel figure from a single groupby pass on LIVREUR.
+    :clean_df: rollup (build_livraison_rollup) or clean rows
+    Returns:
+        - {"ACCOMPTE", "CREDIT", "VERS. CREDIT", "VERSEMENT", "TOTAL COMMANDE", "CHARGES", "RETOUR"}
+        - VERSEMENT, T.LOGICIEL, CHARGE, RETOUR per LIVREUR (same pass)
+    """
+    by_livreur = (
+        _as_rollup(clean_df)
+        .groupby("LIVREUR", observed=True, dropna=False)[["VERSEMENT", "T.LOGICIEL", "CHARGE", "RETOUR"]]
+        .sum()
+    )
+    totals = by_livreur.sum()
+    versement = by_livreur["VERSEMENT"]
     # Extract values safely
     etat_excel = {
-        "ACCOMPTE": float(livreur["VERSEMENT"].get("ACCOMPTE", 0)),
-        "CREDIT": float(livreur["VERSEMENT"].get("CREDIT", 0)),
-        "VERS. CREDIT": float(livreur["VERSEMENT"].get("VERS. CREDIT", 0)),
-        "VERSEMENT": float(versement["VERSEMENT"].sum()),
-        "TOTAL COMMANDE": float(total_command["T.LOGICIEL"].sum()),
-        "CHARGES": float(charges["CHARGE"].sum()),
-        "RETOUR": float(total_retour.set_index("LIVREUR").get("RETOUR", {}).sum()),
+        "ACCOMPTE": float(versement.get("ACCOMPTE", 0)),
+        "CREDIT": float(versement.get("CREDIT", 0)),
+        "VERS. CREDIT": float(versement.get("VERS. CREDIT", 0)),
+        "VERSEMENT": float(totals["VERSEMENT"]),
+        "TOTAL COMMANDE": float(totals["T.LOGICIEL"]),
+        "CHARGES": float(totals["CHARGE"]),
+        "RETOUR": float(totals["RETOUR"]),
     }
-    return etat_excel
+    return etat_excel, by_livreur
+
+
+def etat_excel_like_db(clean_df):
+    """
+    this function return
+    ["ACCOMTE", "CREDIT", "VERSEMENT CREDIT", "CHARGE"] to display in QLabel Excel Etat
+    :clean_df: rollup (build_livraison_rollup) or clean rows
+    """
+    return etat_mensuel(clean_df)[0]
 
 
 def sum_by_driver(clean_df, fields, livreur_selection=["AMINE", "TOUFIK", "REDA", "MOHAMED"]):
     """
     ETAT TOTAL BY LIVREUR
-    clean_df: DataFrame
+    clean_df: DataFrame (rollup or clean rows)
     fields: list of fields to sum
     """
     # --- TOTAL PAR LIVREUR SUMMARY ---
-    driver_stats = clean_df.groupby("LIVREUR", as_index=False)[fields].sum()
+    driver_stats = _as_rollup(clean_df).groupby("LIVREUR", as_index=False, observed=True)[fields].sum()
     driver_stats = driver_stats[driver_stats["LIVREUR"].isin(livreur_selection)]
     driver_stats = driver_stats.set_index("LIVREUR")
     return driver_stats
@@ -172,20 +905,14 @@ def driver_retour(clean_df):
     """
     Calculate RETOUR = T. COMMANDE - T.LOGICIEL
     Returns:
-        - Detailed rows (with TOTAL row)
+        - Detailed rows per DATE and LIVREUR (with TOTAL row)
         - Sum of RETOUR grouped by LIVREUR
     """
-    df = clean_df.copy()                                    # --- Work on a copy
-    df["RETOUR"] = df["T. COMMANDE"] - df["T.LOGICIEL"]     # --- Compute RETOUR
-    # --- Keep needed columns & drop NaNs
-    retour = (
-        df[["DATE", "LIVREUR", "T. COMMANDE", "T.LOGICIEL", "RETOUR"]]
-        .dropna(subset=["T. COMMANDE", "T.LOGICIEL"])
-        .copy()
-    )
+    # --- Keep needed columns (RETOUR is already in the rollup)
+    retour = _as_rollup(clean_df)[["DATE", "LIVREUR", "T. COMMANDE", "T.LOGICIEL", "RETOUR"]]
     # --- Sum RETOUR by driver (BEFORE adding TOTAL row)
     sum_retour_by_driver = (
-        retour.groupby("LIVREUR", as_index=False)["RETOUR"]
+        retour.groupby("LIVREUR", as_index=False, observed=True)["RETOUR"]
         .sum()
     )
     # --- TOTAL row
@@ -204,20 +931,22 @@ def driver_retour(clean_df):
 def get_day_details(clean_df, day, fields):
     """
     Show details for a specific day
-    :clean_df: DataFrame
+    :clean_df: DataFrame (rollup or clean rows)
     :day: str or datetime [YYYY-MM-DD]
     :fields: list of fields to sum
     """
     day = pd.to_datetime(day, errors="coerce").date()
+    rollup = _as_rollup(clean_df)
     daily_details = (
-        clean_df
-        .groupby(["DATE", "LIVREUR"], as_index=False)[fields]
+        rollup[rollup["DATE"] == day]           # Already one row per (DATE, LIVREUR)
+        .groupby(["DATE", "LIVREUR"], as_index=False, observed=True)[fields]
         .sum()
     )
-    daily_details["OBSERVATION"] = daily_details["OBSERVATION"].astype("string")
+    if "OBSERVATION" in daily_details.columns:
+        daily_details["OBSERVATION"] = daily_details["OBSERVATION"].astype("string")
 
-    if day in daily_details["DATE"].values:
-        return {"success": True, "data": daily_details[daily_details["DATE"] == day]}
+    if len(daily_details):
+        return {"success": True, "data": daily_details}
     else:
         return {"success": False, "data": "No data"}
 
@@ -225,65 +954,220 @@ def get_day_details(clean_df, day, fields):
 def driver_observations(clean_df):
     """
     Generate observations for each driver based on their performance.
-    :clean_df: DataFrame
+    :clean_df: DataFrame (rollup or clean rows)
     """
-    driver_obs = clean_df.groupby(["LIVREUR"])["OBSERVATION"].sum()
+    driver_obs = _as_rollup(clean_df).groupby(["LIVREUR"], observed=True)["OBSERVATION"].sum()
     return driver_obs.reset_index()
 
 
 # ----------------------------------------------------------------------
 # ---- VENTE PAGE ----
 # --------------------
-def read_sales_files(files):
+def read_sales_files(files, engine="openpyxl", workers=1, store=True):
+    """
+    Load the VENTE_<MOIS>_<YEAR>.xlsx exports, one sheet per PREVENDEUR (first sheet skipped).
+    :engine: "openpyxl" -> pd.read_excel on every row of the sheet
+             "stream"   -> openpyxl read-only rows, only SALES_COLUMNS kept, stop at the TOTAL row
+             "calamine" -> same streaming on the calamine (Rust) reader, needs python-calamine
+    :workers: processes used to parse the files (None = all CPUs, 1 = serial)
+    :store: also upsert every loaded sheet in the persistent store
+    """
+    if engine not in SALES_ENGINES:
+        return {"success": False, "message": f"Moteur de lecture inconnu: {engine}"}
+
     # Accept single file or list of files
     if not isinstance(files, (list, tuple)):
         files = [files]
 
-    dfs = []
-    cols = ["Famille", "Sous famille", "Produit", "Quantité.1", "Total livraison (DA)", "Total bénéfice (DA)"]
+    try:
+        dfs = itertools.chain.from_iterable(map_files(_read_sales_file, files, workers, engine, store))
+        final_df = (
+            pd.concat(dfs, ignore_index=True)
+            .sort_values(by=["YEAR", "MOIS_NUM", "PREVENDEUR"], kind="stable", ignore_index=True)
+            .pipe(apply_schema, VENTE_CATEGORIES)
+        )
+        return {"success": True, "df": final_df}
+    except Exception as err:
+        return {"success": False, "message": str(err)}
+
+
+def read_sales_exports(exports, year, mois, engine="stream", workers=1, store=True):
+    """
+    Load the TrizStock exports of one month, one file per PREVENDEUR (data on the first sheet),
+    with the same rules as read_sales_files (no merged workbook needed).
+    :exports: {PREVENDEUR: file}, or {PREVENDEUR: [files]} for exports of several windows of the month
+    :mois: month name as in MONTHS_NAMES (JANVIER, ...)
+    """
+    if engine not in SALES_ENGINES:
+        return {"success": False, "message": f"Moteur de lecture inconnu: {engine}"}
+    mois = mois.upper()
+    if mois not in mois_order:
+        return {"success": False, "message": f"Mois invalide: {mois}"}
 
     try:
-        for file in files:
-            xls = pd.ExcelFile(file)
-
-            # --- Extract month & year from filename ---
-            filename = os.path.basename(file.name)  # VENTE_JANVIER_2026.xlsx
-            name, _ = os.path.splitext(filename)
-
-            match = re.search(r"_([A-ZÉÈÊÎÔÛ]+)_(\d{4})$", name)
-            if not match:
-                return {"success": False, "message": f"Fichier invalide: {filename}"}
-
-            mois = match.group(1)
-            year = int(match.group(2))
-
-            # --- Read sheets ---
-            for sheet in xls.sheet_names[1:]:
-                df = pd.read_excel(
-                    file,
-                    sheet_name=sheet,
-                    skiprows=14,
-                    header=0,
-                    usecols=cols,
-                )
-                df = (
-                    df[df["Famille"].notna()]              # Drop totals
-                    .rename(columns={"Quantité.1": "Quantité"})
-                    .assign(
-                        PREVENDEUR=sheet,
-                        YEAR=year,
-                        MOIS=mois,
-                        MOIS_NUM=lambda x: x["MOIS"].map(mois_order),
-                    )
-                )
-                dfs.append(df)
-        final_df = pd.concat(dfs, ignore_index=True)
-        final_df.sort_values(by=["YEAR", "MOIS_NUM", "MOIS"])
+        dfs = map_files(_read_sales_export, list(exports.items()), workers, int(year), mois, engine, store)
+        final_df = (
+            pd.concat(dfs, ignore_index=True)
+            .sort_values(by=["YEAR", "MOIS_NUM", "PREVENDEUR"], kind="stable", ignore_index=True)
+            .pipe(apply_schema, VENTE_CATEGORIES)
+        )
         return {"success": True, "df": final_df}
     except Exception as err:
         return {"success": False, "message": str(err)}
 
 
+def read_sales_store():
+    """
+    Same result as read_sales_files, from the persistent store (no Excel parsing).
+    """
+    df = load_store("vente")
+    if df is None:
+        return {"success": False, "message": "Aucune vente enregistrée."}
+    return {"success": True, "df": df}
+
+
+def _read_sales_file(file, engine, store=False):
+    workbook = open_workbook(file, "openpyxl" if engine == "stream" else engine)
+
+    # --- Extract month & year from filename ---
+    filename = workbook.name                # VENTE_JANVIER_2026.xlsx
+    name, _ = os.path.splitext(filename)
+
+    match = re.search(r"_([A-ZÉÈÊÎÔÛ]+)_(\d{4})$", name)
+    if not match:
+        raise ValueError(f"Fichier invalide: {filename}")
+
+    mois = match.group(1)
+    year = int(match.group(2))
+
+    # --- Read sheets (one parse for all of them) ---
+    sheets = _sales_sheets(workbook, workbook.sheet_names[1:], engine)
+    return [
+        _sales_frame(df, sheet, year, mois, source=f"{workbook.digest}:{sheet}", store=store)
+        for sheet, df in sheets.items()
+    ]
+
+
+def _read_sales_export(export, year, mois, engine, store=False):
+    # export: (PREVENDEUR, file or [files]), the data is on the first sheet of each file.
+    # Several files = exports of consecutive date windows of the month, their totals are added.
+    prevendeur, files = export
+    if not isinstance(files, (list, tuple)):
+        files = [files]
+
+    dfs, sources = [], []
+    for file in files:
+        workbook = open_workbook(file, "openpyxl" if engine == "stream" else engine)
+        sheet = workbook.sheet_names[0]
+        dfs.append(_sales_sheets(workbook, [sheet], engine)[sheet])
+        sources.append(f"{workbook.digest}:{sheet}")
+
+    df = dfs[0]
+    if len(dfs) > 1:
+        df = (
+            pd.concat(dfs, ignore_index=True)
+            .groupby(["Famille", "Sous famille", "Produit"], as_index=False, sort=False, dropna=False)
+            [["Quantité", "Total livraison (DA)", "Total bénéfice (DA)"]]
+            .sum()
+        )
+    return _sales_frame(df, prevendeur, year, mois, source=",".join(sources), store=store)
+
+
+def _sales_sheets(workbook, sheets, engine):
+    """
+    Cleaned sales frames of the sheets of a workbook -> {sheet: df}.
+    """
+    def stream(sheets):
+        return {sheet: _stream_sales_sheet(workbook.rows(sheet)) for sheet in sheets}
+
+    # The readers differ on the footer (stream stops at the TOTAL row): one cache entry each
+    return workbook.frames(
+        sheets, "vente", _clean_sales, reader=None if engine == "openpyxl" else stream, key={"engine": engine},
+        skiprows=14, header=0, usecols=SALES_COLUMNS,
+    )
+
+
+def _sales_frame(df, prevendeur, year, mois, source=None, store=False):
+    if store:
+        partition = {"PREVENDEUR": prevendeur, "YEAR": year, "MOIS": mois}
+        store_upsert(df, "vente", partition, source=source)
+    return df.assign(
+        PREVENDEUR=prevendeur,
+        YEAR=year,
+        MOIS=mois,
+        MOIS_NUM=lambda x: x["MOIS"].map(mois_order),
+    )
+
+
+def _stream_sales_sheet(rows, skiprows=14):
+    """
+    Build the raw sales frame from streamed rows, same result as
+    pd.read_excel(skiprows=14, header=0, usecols=SALES_COLUMNS) without the total rows.
+    """
+    rows = itertools.islice(rows, skiprows, None)       # Preamble of the export
+
+    # --- Header, duplicated names numbered like pandas ("Quantité", "Quantité.1") ---
+    names, seen = [], {}
+    for name in next(rows, ()):
+        name = "" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+
+    missing = [col for col in SALES_COLUMNS if col not in names]
+    if missing:
+        raise ValueError(f"Colonnes introuvables: {missing}")
+    positions = [names.index(col) for col in SALES_COLUMNS]
+
+    data = []
+    for row in rows:
+        famille, _, produit = (row[i] if i < len(row) else None for i in positions[:3])
+        if famille is None or famille == "":
+            if str(produit or "").strip().upper() == "TOTAL":
+                break           # Total row, the rest is the footer
+            continue            # Blank Famille inside the table, dropped by _clean_sales too
+        data.append([_cell_value(row[i]) if i < len(row) else None for i in positions])
+    return pd.DataFrame(data, columns=SALES_COLUMNS)
+
+
+def _cell_value(value):
+    # Same conversions as the pandas Excel readers
+    if value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _clean_sales(df):
+    df = df[df["Famille"].notna()]             # Drop totals
+    # Numeric names (e.g. Produit 1664) as text: one type per column, storable in Parquet
+    names = {col: df[col].map(str, na_action="ignore") for col in ["Famille", "Sous famille", "Produit"]}
+    return (
+        df.assign(**names)
+        .rename(columns={"Quantité.1": "Quantité"})
+        .reset_index(drop=True)
+    )
+
+
+@memoize()
+def build_product_cube(df_mois: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quantité / Livraison / Bénéfice summed at the PRODUCT_CUBE_KEYS grain.
+    Every Vente table (totals, produits, familles) is a slice of it and a small roll-up,
+    with the same column names as the raw rows (a blank Sous famille / Produit is kept: same totals).
+    """
+    return (
+        df_mois
+        .groupby(PRODUCT_CUBE_KEYS, as_index=False, observed=True, sort=True, dropna=False)[FAMILLE_FIELDS]
+        .sum()
+    )
+
+
+@memoize()
 def build_totals_mois(df_mois: pd.DataFrame) -> pd.DataFrame:
     """
     Totaux par MOIS avec variation par rapport au mois précédent.
@@ -292,29 +1176,18 @@ def build_totals_mois(df_mois: pd.DataFrame) -> pd.DataFrame:
     # --- Group & aggregate ---
     df_total = (
         df_mois
-        .groupby(["YEAR", "MOIS_NUM", "MOIS"], as_index=False)
+        .groupby(["YEAR", "MOIS_NUM", "MOIS"], as_index=False, observed=True)
         .agg(
             livraison=("Total livraison (DA)", "sum"),
             benefice=("Total bénéfice (DA)", "sum"),
         )
-        .sort_values(["YEAR", "MOIS_NUM"])
     )
 
     # --- Deltas (month over month) ---
-    df_total["delta_livraison"] = df_total["livraison"].diff().fillna(0)
-    df_total["delta_benefice"] = df_total["benefice"].diff().fillna(0)
-
-    # --- Percentage deltas ---
-    df_total["delta_livraison_pct"] = (
-        df_total["livraison"].pct_change().mul(100).fillna(0)
-    )
-    df_total["delta_benefice_pct"] = (
-        df_total["benefice"].pct_change().mul(100).fillna(0)
-    )
-
-    return df_total.reset_index(drop=True)
+    return add_deltas(df_total, ["livraison", "benefice"]).reset_index(drop=True)
 
 
+@memoize()
 def build_totals_prevendeur_mois(df_mois: pd.DataFrame) -> pd.DataFrame:
     """
     Totaux par PREVENDEUR et par MOIS,
@@ -324,49 +1197,18 @@ def build_totals_prevendeur_mois(df_mois: pd.DataFrame) -> pd.DataFrame:
     # --- Group & aggregate ---
     df_total = (
         df_mois
-        .groupby(["PREVENDEUR", "YEAR", "MOIS_NUM", "MOIS"], as_index=False)
+        .groupby(["PREVENDEUR", "YEAR", "MOIS_NUM", "MOIS"], as_index=False, observed=True)
         .agg(
             livraison=("Total livraison (DA)", "sum"),
             benefice=("Total bénéfice (DA)", "sum"),
         )
-        .sort_values(["YEAR", "MOIS_NUM"])
     )
 
     # --- Deltas (month over month per PREVENDEUR) ---
-    df_total["delta_livraison"] = (
-        df_total
-        .groupby("PREVENDEUR")["livraison"]
-        .diff()
-        .fillna(0)
-    )
-
-    df_total["delta_benefice"] = (
-        df_total
-        .groupby("PREVENDEUR")["benefice"]
-        .diff()
-        .fillna(0)
-    )
-
-    # --- Percentage deltas ---
-    df_total["delta_livraison_pct"] = (
-        df_total
-        .groupby("PREVENDEUR")["livraison"]
-        .pct_change()
-        .mul(100)
-        .fillna(0)
-    )
-
-    df_total["delta_benefice_pct"] = (
-        df_total
-        .groupby("PREVENDEUR")["benefice"]
-        .pct_change()
-        .mul(100)
-        .fillna(0)
-    )
-
-    return df_total.reset_index(drop=True)
+    return add_deltas(df_total, ["livraison", "benefice"], by=["PREVENDEUR"]).reset_index(drop=True)
 
 
+@memoize()
 def familly_groupe(df):
     """
     This will return
@@ -375,34 +1217,58 @@ def familly_groupe(df):
     """
     familly_groupe = (
         df
-        .groupby("Famille", as_index=False)[FAMILLE_FIELDS]
+        .groupby("Famille", as_index=False, observed=True)[FAMILLE_FIELDS]
         .sum()
         .sort_values("Quantité", ascending=False)
     )
     # Chart
-    familly_chart = px.pie(
-        df,
-        names="Famille",
-        values="Quantité",
-        title="Produit par famille",
-        template="plotly_white",
-    )
+    familly_chart = pie_chart(df, "Famille", "Quantité", title="Produit par famille")
     return familly_groupe, familly_chart
 
 
+@memoize()
 def sfamilly_groupe(df):
     sfamilly_groupe = (
-        df.groupby("Sous famille", as_index=False)[FAMILLE_FIELDS]
+        df.groupby("Sous famille", as_index=False, observed=True)[FAMILLE_FIELDS]
         .sum()
         .sort_values("Quantité", ascending=False)
     )
 
     # Chart
-    sfamilly_chart = px.pie(
-        sfamilly_groupe,
-        names="Sous famille",
-        values="Quantité",
-        title="Produit Par Sous Famille %",
-        template="plotly_white",
-    )
+    sfamilly_chart = pie_chart(sfamilly_groupe, "Sous famille", "Quantité", title="Produit Par Sous Famille %")
     return sfamilly_groupe, sfamilly_chart
+
+
+@memoize()
+def build_produits(df, by=("Produit",)):
+    """
+    Totaux par produit (Quantité, Livraison, Bénéfice), triés par quantité.
+    """
+    return (
+        df
+        .groupby(list(by), as_index=False, observed=True)
+        .agg(
+            qte=("Quantité", "sum"),
+            livraison=("Total livraison (DA)", "sum"),
+            benefice=("Total bénéfice (DA)", "sum")
+        )
+        .sort_values("qte", ascending=False)
+        .rename(columns={"qte": "Quantité", "livraison": "Total Livraison", "benefice": "Total Bénéfice"})
+    )
+
+
+@memoize()
+def pivot_prevendeur_mois(df_total):
+    """
+    Vue croisée PREVENDEUR / MOIS des totaux de build_totals_prevendeur_mois.
+    """
+    return df_total.pivot_table(
+        index="PREVENDEUR",
+        columns="MOIS",
+        values=["livraison", "benefice"],
+        aggfunc="sum",
+        fill_value=0,
+        margins=True, margins_name="Totals",
+        sort=False,
+        observed=True,
+    )
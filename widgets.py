@@ -5,7 +5,11 @@
 # created       :
 # desc          :
 # ----------------------------------------------------------------------------
+import math
 import streamlit as st
+import utils
+
+PAGE_SIZE = 50          # Rows sent to the browser by paginated_table
 
 
 def two_chart_columns(root, chart, chart_2):
@@ -63,3 +67,43 @@ def display_prevendeur_totals(root, row):
         border=True
     )
     root.divider()
+
+
+@st.fragment
+def paginated_table(df, key, search_column=None, placeholder="Rechercher", page_size=PAGE_SIZE, **kwargs):
+    """
+    Table that keeps df on the server: search, sort and paging are done here,
+    only the visible rows are sent to the browser. Runs as a fragment (paging doesn't rerun the page).
+    :key: key of the search box, the other inputs use <key>_sort, <key>_order, <key>_page
+    :search_column: column searched by the text box (accent / case insensitive), None = no search box
+    :kwargs: passed to st.dataframe
+    """
+    search_col, sort_col, order_col, page_col = st.columns([0.4, 0.25, 0.15, 0.2], vertical_alignment="bottom")
+
+    # --- Filter ---
+    if search_column:
+        query = search_col.text_input(
+            label=f"Search {search_column}",
+            placeholder=placeholder,
+            key=key,
+            icon="🔎"
+        )
+        if query:
+            df = utils.filter_rows(df, search_column, query)
+
+    # --- Sort ---
+    sort_by = sort_col.selectbox("Trier par", ["—", *df.columns], key=f"{key}_sort")
+    descending = order_col.toggle("Décroissant", key=f"{key}_order")
+    if sort_by != "—":
+        df = utils.sort_rows(df, sort_by, ascending=not descending)
+
+    # --- Page ---
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = page_col.number_input(f"Page (sur {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    page = min(page, pages)
+    start = (page - 1) * page_size
+    window = df.iloc[start:start + page_size]
+
+    kwargs.setdefault("hide_index", True)
+    st.dataframe(window, **kwargs)
+    st.caption(f"Lignes {start + 1 if len(df) else 0}–{start + len(window)} sur {len(df)}")